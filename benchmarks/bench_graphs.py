@@ -0,0 +1,375 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from uuid import uuid4
+
+# Offline benchmark of the meeting graphs against the deterministic fake chat
+# model: per-turn latency percentiles, orchestration overhead (wall time minus
+# simulated model time), checkpointer cost, serialized checkpoint bytes per
+# turn and memory growth per thread.
+#
+#   python benchmarks/bench_graphs.py --meetings 20 --max-overhead-ms 50
+#
+# Exits with status 1 if the p95 graph overhead per turn exceeds the budget,
+# so it can run as a CI regression gate without network access.
+
+_root = Path(__file__).resolve().parent.parent
+if str(_root) not in sys.path:
+    sys.path.insert(0, str(_root))
+
+# a benchmark sose használjon cache-t vagy valódi API kulcsot
+os.environ["MC_RESPONSE_CACHE"] = "0"
+os.environ.pop("MC_CHECKPOINT_DB", None)
+os.environ.setdefault("OPENAI_API_KEY", "sk-offline-benchmark")
+
+from langgraph.checkpoint.memory import InMemorySaver  # noqa: E402
+
+from src import fakeLLM  # noqa: E402
+from src.checkpointing import CompactingSqliteSaver  # noqa: E402
+from src.llmClients import set_chat_model_factory  # noqa: E402
+
+OPENING = "Egy egyszerű dropshipping termék landing + checkout flow-t szeretnék. Hogyan kezdjünk neki?"
+
+
+def percentiles(values, points=(50, 90, 95, 99)):
+    if not values:
+        return {f"p{p}": None for p in points}
+    ordered = sorted(values)
+    return {
+        f"p{p}": ordered[min(len(ordered) - 1, round(p / 100 * (len(ordered) - 1)))]
+        for p in points
+    }
+
+
+class _TimedCheckpointer:
+    # mixin: a checkpointer hívásainak összideje
+    checkpoint_seconds = 0.0
+    checkpoint_calls = 0
+
+    def _timed(self, fn, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self.checkpoint_seconds += time.perf_counter() - started
+            self.checkpoint_calls += 1
+
+    def put(self, *args, **kwargs):
+        return self._timed(super().put, *args, **kwargs)
+
+    def put_writes(self, *args, **kwargs):
+        return self._timed(super().put_writes, *args, **kwargs)
+
+    def get_tuple(self, *args, **kwargs):
+        return self._timed(super().get_tuple, *args, **kwargs)
+
+
+class _SizedCheckpointer:
+    # mixin: a checkpointok és write-ok szerializált mérete (JsonPlusSerializer),
+    # külön a gyökér namespace-re és a subgraph (pl. "fe:<task_id>") namespace-ekre
+    root_bytes = 0
+    child_bytes = 0
+    child_namespaces = None
+
+    @property
+    def checkpoint_bytes(self):
+        return self.root_bytes + self.child_bytes
+
+    def _count(self, config, size):
+        ns = config["configurable"].get("checkpoint_ns", "")
+        if not ns:
+            self.root_bytes += size
+            return
+        self.child_bytes += size
+        if self.child_namespaces is None:
+            self.child_namespaces = set()
+        self.child_namespaces.add(ns)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        self._count(config, len(self.serde.dumps_typed(checkpoint)[1]))
+        return super().put(config, checkpoint, metadata, new_versions)
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        self._count(config, sum(len(self.serde.dumps_typed(v)[1]) for _, v in writes))
+        return super().put_writes(config, writes, task_id, task_path)
+
+
+class TimedMemorySaver(_TimedCheckpointer, InMemorySaver):
+    pass
+
+
+class SizedMemorySaver(_SizedCheckpointer, InMemorySaver):
+    pass
+
+
+class TimedSqliteSaver(_TimedCheckpointer, CompactingSqliteSaver):
+    pass
+
+
+def bench_meeting_graph(
+    meetings: int, checkpointer, label: str, schedule=None, speculative=False
+):
+    from src.conversationBuilder import PRODUCT_BRIEF, build_app, stream_turns
+    from src.telemetry import state_summary
+
+    app = build_app(
+        PRODUCT_BRIEF,
+        checkpointer=checkpointer,
+        response_cache=None,
+        schedule=schedule,
+        speculative=speculative,
+    )
+    turn_latencies = []
+    ttfts = []
+    overheads = []
+    stop_reasons = {}
+    speculation = {"hits": 0, "misses": 0, "saved_s": 0.0}
+
+    tracemalloc.start()
+    mem_before = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+
+    for _ in range(meetings):
+        config = {"configurable": {"thread_id": f"bench-{uuid4().hex}"}}
+        initial = {
+            "messages": [{"role": "user", "content": OPENING}],
+            "turn": 0,
+            "stop_reason": "",
+            "turns_saved": 0,
+        }
+        busy_before = fakeLLM.busy_seconds()
+        meeting_start = time.perf_counter()
+        turns = 0
+        for event in stream_turns(app, initial, config):
+            if event["type"] != "message":
+                continue
+            turns += 1
+            turn_latencies.append(event["elapsed"])
+            if event["ttft"] is not None:
+                ttfts.append(event["ttft"])
+        wall = time.perf_counter() - meeting_start
+        busy = fakeLLM.busy_seconds() - busy_before
+        if turns:
+            overheads.append((wall - busy) / turns)
+        # minőség-proxy a schedule hosszához: konvergált-e (korai stop) és hány turn alatt
+        values = app.get_state(config).values
+        reason = values.get("stop_reason")
+        stop_reasons[reason or "max_turns"] = stop_reasons.get(reason or "max_turns", 0) + 1
+        total = state_summary(values.get("metrics")).get("total")
+        if total:
+            speculation["hits"] += total["spec_hits"]
+            speculation["misses"] += total["spec_misses"]
+            speculation["saved_s"] += total["spec_saved_s"]
+
+    elapsed = time.perf_counter() - started
+    mem_after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return {
+        "graph": label,
+        "schedule": schedule,
+        "meetings": meetings,
+        "turns": len(turn_latencies),
+        "elapsed_s": elapsed,
+        "turn_latency_s": percentiles(turn_latencies),
+        "ttft_s": percentiles(ttfts),
+        "overhead_per_turn_s": percentiles(overheads),
+        "checkpoint_s_per_turn": checkpointer.checkpoint_seconds / max(len(turn_latencies), 1),
+        "checkpoint_calls": checkpointer.checkpoint_calls,
+        "memory_per_thread_bytes": (mem_after - mem_before) / max(meetings, 1),
+        "stop_reasons": stop_reasons,
+        "speculation": speculation if speculative else None,
+    }
+
+
+def bench_simple_graph(runs: int):
+    from src.simpleConversation import graph
+    from src.roleRouter import router_stats
+
+    latencies = []
+    overheads = []
+    messages = [
+        "Milyen React komponensekre bontsuk a checkout űrlapot?",
+        "Mik az üzleti követelmények és a határidő az MVP-hez?",
+        "Mit gondolsz erről?",
+    ]
+    for i in range(runs):
+        busy_before = fakeLLM.busy_seconds()
+        started = time.perf_counter()
+        graph.invoke({"messages": [{"role": "user", "content": messages[i % len(messages)]}]})
+        wall = time.perf_counter() - started
+        latencies.append(wall)
+        overheads.append(wall - (fakeLLM.busy_seconds() - busy_before))
+
+    return {
+        "graph": "simpleConversation",
+        "runs": runs,
+        "latency_s": percentiles(latencies),
+        "overhead_s": percentiles(overheads),
+        "router": router_stats(),
+    }
+
+
+class _Placeholder:
+    # st.empty() helyettesítő: csak számolja a markdown frissítéseket
+    def __init__(self):
+        self.updates = 0
+
+    def markdown(self, _text):
+        self.updates += 1
+
+
+def bench_checkpoint_size(meetings: int):
+    # külön futás, hogy a méretezés ne számítson bele az overhead mérésekbe
+    from src.conversationBuilder import PRODUCT_BRIEF, build_app, stream_turns
+    from src.simpleConversation import get_graph
+
+    saver = SizedMemorySaver()
+    app = build_app(PRODUCT_BRIEF, checkpointer=saver, response_cache=None)
+    turns = 0
+    for _ in range(meetings):
+        config = {"configurable": {"thread_id": f"size-{uuid4().hex}"}}
+        initial = {"messages": [{"role": "user", "content": OPENING}], "turn": 0}
+        turns += sum(1 for e in stream_turns(app, initial, config) if e["type"] == "message")
+
+    # simpleConversation: egy thread, több user üzenet (a history itt nő)
+    simple_saver = SizedMemorySaver()
+    simple = get_graph().builder.compile(checkpointer=simple_saver)
+    config = {"configurable": {"thread_id": f"size-{uuid4().hex}"}}
+    for i in range(meetings):
+        simple.invoke({"messages": [{"role": "user", "content": f"{OPENING} ({i})"}]}, config)
+
+    return {
+        "graph": "checkpoint_size",
+        "meetings": meetings,
+        "meeting_bytes_per_turn": saver.checkpoint_bytes / max(turns, 1),
+        "meeting_root_bytes_per_turn": saver.root_bytes / max(turns, 1),
+        "meeting_child_bytes_per_turn": saver.child_bytes / max(turns, 1),
+        "meeting_child_namespaces": len(saver.child_namespaces or ()),
+        "simple_bytes_per_turn": simple_saver.checkpoint_bytes / max(meetings, 1),
+        "simple_child_bytes_per_turn": simple_saver.child_bytes / max(meetings, 1),
+    }
+
+
+def bench_ui_loop(meetings: int):
+    # the Streamlit script's consume loop without Streamlit itself
+    from src.conversationBuilder import PRODUCT_BRIEF, build_app, message_text, stream_turns
+
+    app = build_app(PRODUCT_BRIEF, checkpointer=InMemorySaver(), response_cache=None)
+    per_event = []
+    updates = 0
+    for _ in range(meetings):
+        config = {"configurable": {"thread_id": f"ui-{uuid4().hex}"}}
+        initial = {"messages": [{"role": "user", "content": OPENING}], "turn": 0}
+        placeholders, buffers, seen = {}, {}, set()
+        for event in stream_turns(app, initial, config):
+            node = event["node"]
+            handle_start = time.perf_counter()
+            placeholders.setdefault(node, _Placeholder())
+            if event["type"] == "token":
+                buffers[node] = buffers.get(node, "") + event["text"]
+                placeholders[node].markdown(buffers[node])
+            else:
+                text = message_text(event["message"])
+                placeholders[node].markdown(text)
+                seen.add(getattr(event["message"], "id", None) or hash(text))
+                updates += placeholders.pop(node).updates
+                buffers.pop(node, None)
+            per_event.append(time.perf_counter() - handle_start)
+
+    return {
+        "graph": "ui_loop",
+        "meetings": meetings,
+        "events": len(per_event),
+        "markdown_updates": updates,
+        "handle_event_s": percentiles(per_event),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks with a fake LLM.")
+    parser.add_argument("--meetings", type=int, default=10)
+    parser.add_argument("--first-token-ms", type=float, default=20.0)
+    parser.add_argument("--token-ms", type=float, default=1.0)
+    parser.add_argument("--tokens", type=int, default=24)
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument(
+        "--schedule",
+        action="append",
+        help="schedule(s) from schedules.json for the meeting graph (repeatable)",
+    )
+    parser.add_argument(
+        "--speculative",
+        action="store_true",
+        help="also run the meeting graph with speculative prefetch of the next role",
+    )
+    parser.add_argument(
+        "--max-overhead-ms",
+        type=float,
+        help="fail if p95 graph overhead per turn exceeds this budget",
+    )
+    args = parser.parse_args(argv)
+
+    set_chat_model_factory(
+        fakeLLM.fake_model_factory(
+            first_token_latency=args.first_token_ms / 1000,
+            token_latency=args.token_ms / 1000,
+            output_tokens=args.tokens,
+        )
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite_saver = TimedSqliteSaver.from_path(str(Path(tmp) / "bench.sqlite"))
+        results = [
+            bench_meeting_graph(
+                args.meetings, TimedMemorySaver(), f"build_app[memory:{name or 'default'}]", name
+            )
+            for name in args.schedule or [None]
+        ]
+        if args.speculative:
+            results += [
+                bench_meeting_graph(
+                    args.meetings,
+                    TimedMemorySaver(),
+                    f"build_app[speculative:{name or 'default'}]",
+                    name,
+                    speculative=True,
+                )
+                for name in args.schedule or [None]
+            ]
+        results += [
+            bench_meeting_graph(args.meetings, sqlite_saver, "build_app[sqlite]"),
+            bench_simple_graph(args.meetings),
+            bench_ui_loop(args.meetings),
+            bench_checkpoint_size(args.meetings),
+        ]
+        sqlite_saver.flush()
+
+    for result in results:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    if args.max_overhead_ms is not None:
+        worst = max(
+            r["overhead_per_turn_s"]["p95"] or 0.0
+            for r in results
+            if "overhead_per_turn_s" in r
+        )
+        if worst * 1000 > args.max_overhead_ms:
+            print(
+                f"❌ p95 graph overhead {worst * 1000:.1f}ms > budget {args.max_overhead_ms}ms"
+            )
+            return 1
+        print(f"✅ p95 graph overhead {worst * 1000:.1f}ms within budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Cold-start budget for the entry points, each measured in a fresh
+# interpreter:
+#   cli     - `import cli` (until the prompt can be shown)
+#   server  - LangGraph server entry: simpleConversation.make_graph()
+#
+#   python benchmarks/cold_start.py --cli-budget-ms 300 --server-budget-ms 1500
+#
+# Prints the slowest imports (python -X importtime) and exits with status 1
+# if an entry point exceeds its budget.
+
+_root = Path(__file__).resolve().parent.parent
+
+ENTRY_POINTS = {
+    "cli": "import cli",
+    "server": "from src.simpleConversation import make_graph; make_graph()",
+}
+
+
+def measure(code: str, runs: int):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=_root,
+            check=True,
+            env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+        )
+        timings.append(time.perf_counter() - started)
+    baseline = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        baseline.append(time.perf_counter() - started)
+    # az interpreter indulását levonjuk, csak az import/építés ideje marad
+    return min(timings) - min(baseline)
+
+
+def slowest_imports(code: str, top: int):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=_root,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # "import time:   self [us] | cumulative | imported package"
+        _, cumulative_us, name = line.split("|", 2)
+        rows.append((int(cumulative_us), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure entry point cold start.")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--cli-budget-ms", type=float)
+    parser.add_argument("--server-budget-ms", type=float)
+    args = parser.parse_args(argv)
+
+    budgets = {"cli": args.cli_budget_ms, "server": args.server_budget_ms}
+    failed = False
+    for name, code in ENTRY_POINTS.items():
+        elapsed_ms = measure(code, args.runs) * 1000
+        budget = budgets[name]
+        status = ""
+        if budget is not None:
+            ok = elapsed_ms <= budget
+            failed |= not ok
+            status = f" ({'✅ within' if ok else '❌ over'} {budget:.0f}ms budget)"
+        print(f"{name}: {elapsed_ms:.0f}ms{status}")
+        for cumulative_us, module in slowest_imports(code, args.top):
+            print(f"    {cumulative_us / 1000:8.1f}ms  {module}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,10 @@
-from src.simpleConversation import ChatState, graph
+from src import simpleConversation
+from src.messages import message_text
 
 
 def main():
-    state = ChatState(messages=[])
+    # a graph (langgraph, agentek) csak az első üzenetnél töltődik be
+    state = {"messages": []}
     print("Chatbot indult. Írj valamit, vagy 'exit'-tel lépj ki.")
     while True:
         user_input = input("Te: ")
@@ -12,10 +14,15 @@ def main():
 
         state["messages"].append({"role": "user", "content": user_input})
 
-        state = graph.invoke(state)
-
-        lastmessage = state["messages"][-1]
-        print(f"Chatbot ({state['last_agent']}):", lastmessage.content[0]["text"])
+        # "updates" stream: lépésenként csak a node új üzenetei jönnek vissza,
+        # nem a teljes state; a history-t helyben bővítjük
+        graph = simpleConversation.get_graph()
+        for update in graph.stream(state, stream_mode="updates"):
+            for node, delta in update.items():
+                for message in (delta or {}).get("messages", []):
+                    state["messages"].append(message)
+                    agent = delta.get("last_agent", node)
+                    print(f"Chatbot ({agent}):", message_text(message))
 
 
 if __name__ == "__main__":
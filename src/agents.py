@@ -1,5 +1,9 @@
-from langchain_openai import ChatOpenAI
-from langchain.agents import create_agent
+import threading
+
+# A modellek és agentek első használatkor épülnek (get_model / get_agent),
+# így a modul importja nem húzza be a langchain_openai / langchain csomagot.
+# A régi attribútum nevek (src.agents.frontendDeveloperAgent stb.) továbbra
+# is működnek a modul __getattr__-ján keresztül.
 
 
 SYSTEM_PROMPT_FRONTEND_DEVELOPER = """
@@ -15,38 +19,68 @@ Anwser the user's question in a friendly and helpful manner.
 """
 
 
-frontendDeveloper = ChatOpenAI(
-    model="gpt-4.1-mini",
-    temperature=0,
-    use_responses_api=True,
-)
-
-frontendDeveloperLocal = ChatOpenAI(
-    model="local-model",
-    temperature=0,
-    base_url="http://localhost:1234/v1",
-    api_key="lm-studio",
-    use_responses_api=False,
-)
-
-
-frontendDeveloperAgent = create_agent(
-    model=frontendDeveloper,
-    system_prompt=SYSTEM_PROMPT_FRONTEND_DEVELOPER,
-)
-
-frontendDeveloperAgentLocal = create_agent(
-    model=frontendDeveloperLocal,
-    system_prompt=SYSTEM_PROMPT_FRONTEND_DEVELOPER,
-)
-
-businessAnalyst = ChatOpenAI(
-    model="gpt-4o-mini",
-    temperature=0,
-    use_responses_api=True,
-)
-
-businessAnalystAgent = create_agent(
-    model=businessAnalyst,
-    system_prompt=SYSTEM_PROMPT_BUSINESS_ANALYST,
-)
+MODEL_SPECS = {
+    "frontendDeveloper": {
+        "model": "gpt-4.1-mini",
+        "temperature": 0,
+        "use_responses_api": True,
+    },
+    "frontendDeveloperLocal": {
+        "model": "local-model",
+        "temperature": 0,
+        "base_url": "http://localhost:1234/v1",
+        "api_key": "lm-studio",
+        "use_responses_api": False,
+    },
+    "businessAnalyst": {
+        "model": "gpt-4o-mini",
+        "temperature": 0,
+        "use_responses_api": True,
+    },
+}
+
+# agent név -> (modell név, system prompt)
+AGENT_SPECS = {
+    "frontendDeveloperAgent": ("frontendDeveloper", SYSTEM_PROMPT_FRONTEND_DEVELOPER),
+    "frontendDeveloperAgentLocal": (
+        "frontendDeveloperLocal",
+        SYSTEM_PROMPT_FRONTEND_DEVELOPER,
+    ),
+    "businessAnalystAgent": ("businessAnalyst", SYSTEM_PROMPT_BUSINESS_ANALYST),
+}
+
+_lock = threading.RLock()
+_registry = {}
+
+
+def get_model(name: str):
+    with _lock:
+        if name not in _registry:
+            from src.llmClients import make_chat_model
+
+            spec = dict(MODEL_SPECS[name])
+            _registry[name] = make_chat_model(spec.pop("model"), **spec)
+        return _registry[name]
+
+
+def get_agent(name: str):
+    with _lock:
+        if name not in _registry:
+            from langchain.agents import create_agent
+
+            model_name, system_prompt = AGENT_SPECS[name]
+            # a node-ban hívott agent ne írjon a szülő graph checkpointerébe
+            _registry[name] = create_agent(
+                model=get_model(model_name),
+                system_prompt=system_prompt,
+                checkpointer=False,
+            )
+        return _registry[name]
+
+
+def __getattr__(name: str):
+    if name in MODEL_SPECS:
+        return get_model(name)
+    if name in AGENT_SPECS:
+        return get_agent(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
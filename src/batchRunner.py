@@ -0,0 +1,206 @@
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from uuid import uuid4
+
+from openai import RateLimitError
+
+_root = Path(__file__).resolve().parent.parent
+if str(_root) not in sys.path:
+    sys.path.insert(0, str(_root))
+
+from src.conversationBuilder import (  # noqa: E402
+    NODE_NAMES,
+    get_app,
+    message_text,
+    stream_turns,
+)
+from src.contextWindow import approx_tokens  # noqa: E402
+from src.schedules import default_schedule  # noqa: E402
+
+# Batch meeting runner:
+#   python src/batchRunner.py briefs.jsonl -o transcripts.jsonl --workers 4
+# Input lines: {"id": "...", "brief": "...", "message": "...", "schedule": "..."}
+# ("message" and "schedule" are optional; --schedule sets the default, e.g. to
+# compare triage vs deep_dive runs on the same briefs). Every finished
+# meeting is appended to the output right away.
+
+DEFAULT_MESSAGE = "Hogyan kezdjünk neki?"
+
+
+class RateLimitGate:
+    # Shared cool-down: one worker hitting a 429 pauses every worker, so the
+    # pool backs off together instead of hammering the API in parallel.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._resume_at = 0.0
+        self.trips = 0
+
+    def wait(self):
+        while True:
+            with self._lock:
+                delay = self._resume_at - time.monotonic()
+            if delay <= 0:
+                return
+            time.sleep(delay)
+
+    def trip(self, seconds: float):
+        with self._lock:
+            self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+            self.trips += 1
+
+
+def _retry_after(err: RateLimitError, attempt: int) -> float:
+    header = getattr(getattr(err, "response", None), "headers", {}).get("retry-after")
+    try:
+        base = float(header)
+    except (TypeError, ValueError):
+        base = 2.0**attempt
+    return base + random.uniform(0, 1)
+
+
+def run_meeting(job, gate: RateLimitGate, max_retries: int):
+    app = get_app(job["brief"], job.get("schedule"))
+    message = job.get("message") or DEFAULT_MESSAGE
+
+    for attempt in range(max_retries + 1):
+        gate.wait()
+        # félbeszakadt meeting checkpointja ne keveredjen az újrapróbálással
+        thread_id = f"batch-{job['id']}-{uuid4().hex[:8]}"
+        # a közös modelScheduler a UI/szerver meetingjeit előre engedi
+        config = {"configurable": {"thread_id": thread_id, "priority": "batch"}}
+        initial = {
+            "messages": [{"role": "user", "content": message}],
+            "turn": 0,
+            "stop_reason": "",
+            "turns_saved": 0,
+        }
+        started = time.perf_counter()
+        try:
+            transcript = []
+            metrics = []
+            for event in stream_turns(app, initial, config):
+                if event["type"] != "message":
+                    continue
+                metrics.extend(event["metrics"])
+                transcript.append(
+                    {
+                        "speaker": NODE_NAMES.get(event["node"], event["node"]),
+                        "text": message_text(event["message"]),
+                        "ttft": event["ttft"],
+                        "elapsed": event["elapsed"],
+                    }
+                )
+        except RateLimitError as err:
+            if attempt == max_retries:
+                raise
+            gate.trip(_retry_after(err, attempt))
+            continue
+
+        final_state = app.get_state(config).values
+        # valódi usage, ha a modell adott; különben szöveg alapú becslés
+        output_tokens = sum(m["output_tokens"] for m in metrics) or sum(
+            approx_tokens(t["text"]) for t in transcript
+        )
+        return {
+            "id": job["id"],
+            "thread_id": thread_id,
+            "status": "ok",
+            "schedule": job.get("schedule") or default_schedule(),
+            "attempts": attempt + 1,
+            "elapsed": time.perf_counter() - started,
+            "stop_reason": final_state.get("stop_reason", ""),
+            "output_tokens": output_tokens,
+            "cached_tokens": sum(m["cached_tokens"] for m in metrics),
+            "cost_usd": sum(m["cost_usd"] for m in metrics),
+            "fallbacks": sum(bool(m.get("fallback")) for m in metrics),
+            "queue_wait_s": round(sum(m.get("queue_wait_s", 0.0) for m in metrics), 4),
+            "transcript": transcript,
+        }
+
+
+def read_jobs(path: str):
+    jobs = []
+    with open(path, encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            job = json.loads(line)
+            if "brief" not in job:
+                raise ValueError(f"{path}:{lineno}: missing 'brief'")
+            job.setdefault("id", str(lineno))
+            jobs.append(job)
+    return jobs
+
+
+def run_batch(
+    jobs, output_path: str, *, workers: int = 4, max_retries: int = 3, schedule=None
+):
+    if schedule:
+        jobs = [{"schedule": schedule, **job} for job in jobs]
+    gate = RateLimitGate()
+    write_lock = threading.Lock()
+    started = time.perf_counter()
+    done = failed = tokens = 0
+
+    with open(output_path, "a", encoding="utf-8") as out, ThreadPoolExecutor(
+        max_workers=workers
+    ) as pool:
+        futures = {pool.submit(run_meeting, job, gate, max_retries): job for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                record = future.result()
+                done += 1
+                tokens += record["output_tokens"]
+            except Exception as err:  # noqa: BLE001 - egy hibás brief ne állítsa le a batch-et
+                record = {"id": job["id"], "status": "error", "error": repr(err)}
+                failed += 1
+            with write_lock:
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+            print(f"[{done + failed}/{len(jobs)}] {job['id']}: {record['status']}")
+
+    elapsed = time.perf_counter() - started
+    stats = {
+        "meetings": done,
+        "failed": failed,
+        "elapsed_s": elapsed,
+        "meetings_per_min": done / elapsed * 60 if elapsed else 0.0,
+        "output_tokens_per_s": tokens / elapsed if elapsed else 0.0,
+        "rate_limit_pauses": gate.trips,
+    }
+    print(
+        f"\n✅ {done} meetings ({failed} failed) in {elapsed:.1f}s — "
+        f"{stats['meetings_per_min']:.2f} meetings/min, "
+        f"~{stats['output_tokens_per_s']:.1f} output tokens/s, "
+        f"{gate.trips} rate-limit pauses"
+    )
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run discovery meetings for many briefs.")
+    parser.add_argument("input", help="JSONL file with {id, brief, message} lines")
+    parser.add_argument("-o", "--output", default="transcripts.jsonl")
+    parser.add_argument("-w", "--workers", type=int, default=4)
+    parser.add_argument("--max-retries", type=int, default=3)
+    parser.add_argument("--schedule", help="default schedule from schedules.json")
+    args = parser.parse_args(argv)
+
+    run_batch(
+        read_jobs(args.input),
+        args.output,
+        workers=args.workers,
+        max_retries=args.max_retries,
+        schedule=args.schedule,
+    )
+
+
+if __name__ == "__main__":
+    main()
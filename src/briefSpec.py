@@ -0,0 +1,186 @@
+import hashlib
+import logging
+import os
+import re
+
+from src.caching import LRUCache
+
+# Pre-meeting stage: the product brief is turned once into a structured spec
+# (goals, features, constraints, non-goals), cached per brief hash and shared
+# by every role, thread and schedule. Every section goes to the one role
+# that acts on it, instead of the whole brief to anyone:
+#   customer: goals + features, in its system prompt (customer_brief),
+#   fe:       constraints,
+#   ba:       non-goals (to keep the scope questions inside the MVP).
+# FE/BA get theirs as one short briefing system message after their shared
+# prompt, so their agents and provider prompt-cache prefix stay
+# brief-independent. The customer's slice replaces the raw brief only when
+# the brief was parsed locally, i.e. the spec holds all of it; otherwise the
+# customer keeps the raw brief (compact_brief only drops the indentation and
+# blank lines), so a model extraction never loses anything for it.
+#
+# Briefs written as "Heading:" lines with "- " bullets (like PRODUCT_BRIEF)
+# are parsed locally; anything else takes one structured-output call
+# (MC_BRIEF_SPEC_MODEL). A failed extraction is remembered for
+# MC_BRIEF_SPEC_RETRY_SECONDS, so one build calls the model at most once;
+# meanwhile FE/BA get no briefing, as before. MC_BRIEF_SPEC=0 turns the
+# stage off.
+
+logger = logging.getLogger("meeting.brief")
+
+SECTIONS = ("goals", "features", "constraints", "non_goals")
+SECTION_TITLES = {
+    "goals": "GOALS",
+    "features": "FEATURES",
+    "constraints": "CONSTRAINTS",
+    "non_goals": "NON-GOALS",
+}
+ROLE_SECTIONS = {
+    "customer": ("goals", "features"),
+    "fe": ("constraints",),
+    "ba": ("non_goals",),
+}
+BRIEFING_HEADER = "PRODUCT BRIEF (your part):\n"
+
+BRIEF_SPEC_MODEL = os.getenv("MC_BRIEF_SPEC_MODEL", "gpt-4.1-nano")
+BRIEF_SPEC_RETRY_SECONDS = float(os.getenv("MC_BRIEF_SPEC_RETRY_SECONDS", "300"))
+
+SYSTEM_PROMPT_BRIEF_SPEC = """
+Split the product brief into goals, MVP features, constraints and non-goals.
+Keep each item short and in the brief's own words; do not add anything.
+"""
+
+# a sorrendnek számít: a "non-goals" a "goals" előtt
+_HEADINGS = (
+    ("non_goals", re.compile(r"non[- ]?goals?|out of scope", re.I)),
+    ("goals", re.compile(r"goals?|objectives?", re.I)),
+    ("features", re.compile(r"(mvp )?(features?|scope|requirements?)", re.I)),
+    ("constraints", re.compile(r"constraints?|limitations?", re.I)),
+)
+_BULLET = re.compile(r"^[-*•]\s+(.+)$")
+_HEADING = re.compile(r"^([^:]{2,40}):\s*(.*)$")
+
+_specs = LRUCache(maxsize=int(os.getenv("MC_BRIEF_SPEC_CACHE_SIZE", "64")))
+# negatív bejegyzések: ezekre a briefekre a kinyerés nem sikerült
+_failed = LRUCache(
+    maxsize=int(os.getenv("MC_BRIEF_SPEC_CACHE_SIZE", "64")), ttl=BRIEF_SPEC_RETRY_SECONDS
+)
+
+
+def brief_hash(product_brief: str) -> str:
+    return hashlib.sha256(product_brief.encode("utf-8")).hexdigest()[:12]
+
+
+def compact_brief(text: str) -> str:
+    # veszteségmentes: csak a behúzás és az üres sorok tűnnek el
+    return "\n".join(line.strip() for line in text.splitlines() if line.strip())
+
+
+def _section_of(heading: str):
+    return next((s for s, pattern in _HEADINGS if pattern.fullmatch(heading.strip())), None)
+
+
+def parse_brief(text: str):
+    # -> spec dict, vagy None, ha a brief nem tisztán "Heading:" + bullet formájú
+    spec = {s: [] for s in SECTIONS}
+    section = None
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+        bullet = _BULLET.match(line)
+        if bullet and section:
+            spec[section].append(bullet.group(1).strip())
+            continue
+        heading = _HEADING.match(line)
+        section = _section_of(heading.group(1)) if heading else None
+        if section is None:
+            return None  # ismeretlen fejléc vagy szabad próza
+        if heading.group(2):
+            spec[section].append(heading.group(2).strip())
+    return spec if any(spec.values()) else None
+
+
+def extract_brief_spec(text: str):
+    from pydantic import BaseModel, Field
+
+    from src.llmClients import make_chat_model
+
+    class BriefSpec(BaseModel):
+        goals: list[str] = Field(default_factory=list, description="What the product is for.")
+        features: list[str] = Field(default_factory=list, description="MVP features.")
+        constraints: list[str] = Field(default_factory=list, description="Constraints.")
+        non_goals: list[str] = Field(default_factory=list, description="Explicitly out of scope.")
+
+    model = make_chat_model(
+        BRIEF_SPEC_MODEL, temperature=0, use_responses_api=True
+    ).with_structured_output(BriefSpec, include_raw=True)
+    result = model.invoke(
+        [
+            {"role": "system", "content": SYSTEM_PROMPT_BRIEF_SPEC},
+            {"role": "user", "content": text},
+        ]
+    )
+    parsed = result.get("parsed")
+    if parsed is None:
+        return None
+    spec = parsed.model_dump()
+    return spec if any(spec.values()) else None
+
+
+def get_brief_spec(product_brief: str):
+    # a sikertelen kinyerés negatív bejegyzést kap (_failed), így lejáratig nem
+    # hívjuk újra a modellt
+    if os.getenv("MC_BRIEF_SPEC", "1") == "0":
+        return None
+    key = brief_hash(product_brief)
+    spec = _specs.get(key)
+    if spec is None:
+        if _failed.get(key):
+            return None
+        spec = parse_brief(product_brief)
+        if spec is None:
+            try:
+                spec = extract_brief_spec(product_brief)
+            except Exception:
+                logger.exception("brief spec extraction failed, FE/BA get no briefing")
+                spec = None
+        if spec is None:
+            _failed.put(key, True)
+            return None
+        _specs.put(key, spec)
+    return spec
+
+
+def render_spec(spec, sections=SECTIONS) -> str:
+    # szekciónként egy sor: a briefing minden turnben újra elmegy
+    return "\n".join(
+        f"{SECTION_TITLES[s]}: " + "; ".join(spec[s]) for s in sections if spec.get(s)
+    )
+
+
+def customer_brief(product_brief: str) -> str:
+    # a customer szelete, ha a brief helyben parse-olható, különben a teljes brief
+    if os.getenv("MC_BRIEF_SPEC", "1") != "0":
+        spec = parse_brief(product_brief)
+        text = render_spec(spec, ROLE_SECTIONS["customer"]) if spec is not None else ""
+        if text:
+            return text
+    return compact_brief(product_brief)
+
+
+def role_briefings(product_brief: str):
+    # {"fe": ..., "ba": ...} briefing üzenetszövegek; {} ha nincs spec
+    spec = get_brief_spec(product_brief)
+    if spec is None:
+        return {}
+    briefings = {}
+    for role in ("fe", "ba"):
+        text = render_spec(spec, ROLE_SECTIONS[role])
+        if text:
+            briefings[role] = BRIEFING_HEADER + text
+    return briefings
+
+
+def brief_spec_stats():
+    return {**_specs.stats(), "failed": len(_failed)}
@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+
+# Thread-safe LRU cache with an optional sliding TTL (counted from the last
+# access, not from put, so busy entries never expire) and
+# hit/miss/eviction counters.
+class LRUCache:
+    def __init__(self, maxsize: int = 32, ttl: float | None = None):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (value, stored_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl is not None and time.monotonic() - stored_at > self.ttl
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or self._expired(entry[1]):
+                if entry is not None:
+                    del self._data[key]
+                    self.evictions += 1
+                self.misses += 1
+                return default
+            self._data[key] = (entry[0], time.monotonic())
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+        if entry is None or self._expired(entry[1]):
+            return default
+        return entry[0]
+
+    def get_or_create(self, key, factory):
+        # a factory a lockon kívül fut, hogy egy lassú build ne blokkolja a többit
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            value = factory()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+# Two-tier cache for agent replies: in-memory LRU in front of a directory of
+# JSON files (one per key), so cached demo/regression runs survive restarts.
+class ResponseCache:
+    def __init__(self, directory: str | None = None, maxsize: int = 256):
+        self.memory = LRUCache(maxsize=maxsize)
+        self.directory = Path(directory) if directory else None
+        self._lock = threading.Lock()
+        self.disk_hits = 0
+        self.stores = 0
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str):
+        value = self.memory.get(key)
+        if value is not None or self.directory is None:
+            return value
+
+        path = self._path(key)
+        try:
+            value = json.loads(path.read_text(encoding="utf-8"))["value"]
+        except (OSError, ValueError, KeyError):
+            return None
+        self.memory.put(key, value)
+        with self._lock:
+            self.disk_hits += 1
+        return value
+
+    def put(self, key: str, value):
+        self.memory.put(key, value)
+        with self._lock:
+            self.stores += 1
+        if self.directory is None:
+            return
+
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # atomikus írás: párhuzamos olvasó sosem lát félig kiírt fájlt
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps({"value": value}, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self.memory.stats(),
+                "disk_hits": self.disk_hits,
+                "stores": self.stores,
+            }
+
+
+_shared_response_cache = None
+_shared_response_cache_lock = threading.Lock()
+
+
+def make_response_cache():
+    # opt-in: MC_RESPONSE_CACHE=1 (lemezes réteg: MC_RESPONSE_CACHE_DIR)
+    global _shared_response_cache
+    if os.getenv("MC_RESPONSE_CACHE", "").lower() not in ("1", "true", "yes"):
+        return None
+    with _shared_response_cache_lock:
+        if _shared_response_cache is None:
+            _shared_response_cache = ResponseCache(
+                directory=os.getenv("MC_RESPONSE_CACHE_DIR", ".cache/responses"),
+                maxsize=int(os.getenv("MC_RESPONSE_CACHE_SIZE", "256")),
+            )
+        return _shared_response_cache
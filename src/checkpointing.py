@@ -0,0 +1,226 @@
+import asyncio
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+
+# SQLite checkpointer for long-running deployments:
+# - WAL journal + synchronous=NORMAL, commits batched (every N writes or
+#   every `commit_interval` seconds, and on flush()/exit)
+# - compaction: only the last `keep_last` checkpoints are kept per thread
+# - TTL eviction: threads idle for longer than `ttl_seconds` are deleted
+class CompactingSqliteSaver(SqliteSaver):
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        *,
+        keep_last: int = 10,
+        commit_every: int = 16,
+        commit_interval: float = 1.0,
+        ttl_seconds: float | None = None,
+        evict_interval: float = 300.0,
+    ):
+        super().__init__(conn)
+        if keep_last < 1:
+            raise ValueError("keep_last must be at least 1")
+        self.keep_last = keep_last
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+        self.ttl_seconds = ttl_seconds
+        self.evict_interval = evict_interval
+        self._pending = 0
+        self._last_commit = time.monotonic()
+        self._last_evict = time.monotonic()
+
+    @classmethod
+    def from_path(cls, path: str, **kwargs):
+        conn = sqlite3.connect(path, check_same_thread=False)
+        return cls(conn, **kwargs)
+
+    def setup(self) -> None:
+        if self.is_setup:
+            return
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        super().setup()
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS thread_activity (
+                thread_id TEXT PRIMARY KEY,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self.conn.commit()
+
+    @contextmanager
+    def cursor(self, transaction: bool = True):
+        with self.lock:
+            self.setup()
+            cur = self.conn.cursor()
+            try:
+                yield cur
+            finally:
+                if transaction:
+                    self._pending += 1
+                    self._maybe_commit()
+                cur.close()
+
+    def _maybe_commit(self):
+        now = time.monotonic()
+        if (
+            self._pending >= self.commit_every
+            or now - self._last_commit >= self.commit_interval
+        ):
+            self.conn.commit()
+            self._pending = 0
+            self._last_commit = now
+
+    def flush(self):
+        with self.lock:
+            self.conn.commit()
+            self._pending = 0
+            self._last_commit = time.monotonic()
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        next_config = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+
+        with self.cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO thread_activity (thread_id, updated_at) VALUES (?, ?)
+                ON CONFLICT(thread_id) DO UPDATE SET updated_at = excluded.updated_at
+                """,
+                (thread_id, time.time()),
+            )
+            self._compact(cur, thread_id, checkpoint_ns)
+
+        if (
+            self.ttl_seconds is not None
+            and time.monotonic() - self._last_evict >= self.evict_interval
+        ):
+            self.evict_expired()
+        return next_config
+
+    def _compact(self, cur, thread_id: str, checkpoint_ns: str):
+        # keep_last per namespace; a root put also drops subgraph namespaces
+        # ("fe:<task_id>", ...) older than the oldest kept root checkpoint,
+        # since no retained checkpoint can reach them any more
+        cur.execute(
+            """
+            DELETE FROM checkpoints
+            WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id NOT IN (
+                SELECT checkpoint_id FROM checkpoints
+                WHERE thread_id = ? AND checkpoint_ns = ?
+                ORDER BY checkpoint_id DESC LIMIT ?
+            )
+            """,
+            (thread_id, checkpoint_ns, thread_id, checkpoint_ns, self.keep_last),
+        )
+        deleted = cur.rowcount
+        if checkpoint_ns == "":
+            cur.execute(
+                """
+                DELETE FROM checkpoints
+                WHERE thread_id = ? AND checkpoint_ns != '' AND checkpoint_id < (
+                    SELECT MIN(checkpoint_id) FROM (
+                        SELECT checkpoint_id FROM checkpoints
+                        WHERE thread_id = ? AND checkpoint_ns = ''
+                        ORDER BY checkpoint_id DESC LIMIT ?
+                    )
+                )
+                """,
+                (thread_id, thread_id, self.keep_last),
+            )
+            deleted += cur.rowcount
+        if deleted:
+            cur.execute(
+                """
+                DELETE FROM writes
+                WHERE thread_id = ? AND NOT EXISTS (
+                    SELECT 1 FROM checkpoints c
+                    WHERE c.thread_id = writes.thread_id
+                    AND c.checkpoint_ns = writes.checkpoint_ns
+                    AND c.checkpoint_id = writes.checkpoint_id
+                )
+                """,
+                (thread_id,),
+            )
+
+    def evict_expired(self) -> int:
+        if self.ttl_seconds is None:
+            return 0
+        cutoff = time.time() - self.ttl_seconds
+        with self.cursor() as cur:
+            cur.execute(
+                "SELECT thread_id FROM thread_activity WHERE updated_at < ?", (cutoff,)
+            )
+            expired = [row[0] for row in cur.fetchall()]
+            for thread_id in expired:
+                cur.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+                cur.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+                cur.execute(
+                    "DELETE FROM thread_activity WHERE thread_id = ?", (thread_id,)
+                )
+        self._last_evict = time.monotonic()
+        return len(expired)
+
+    # SqliteSaver is sync-only; the async graph path runs the same code in a
+    # worker thread instead of keeping a second (aiosqlite) implementation.
+    async def aget_tuple(self, config):
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        items = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in items:
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return await asyncio.to_thread(
+            self.put, config, checkpoint, metadata, new_versions
+        )
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        return await asyncio.to_thread(
+            self.put_writes, config, writes, task_id, task_path
+        )
+
+
+_shared_lock = threading.Lock()
+_shared_saver = None
+_shared_memory_saver = None
+
+
+def make_checkpointer():
+    # MC_CHECKPOINT_DB beállítva -> közös, lemezre író SQLite checkpointer
+    # (túléli az újraindítást), különben egy processz-szintű InMemorySaver.
+    # Mindkettő közös az appok között: ha az app cache kidob egy appot, az
+    # újraépített app ugyanazt a checkpointert kapja, a threadek megmaradnak.
+    global _shared_saver, _shared_memory_saver
+    path = os.getenv("MC_CHECKPOINT_DB")
+    if not path:
+        with _shared_lock:
+            if _shared_memory_saver is None:
+                _shared_memory_saver = InMemorySaver()
+            return _shared_memory_saver
+
+    with _shared_lock:
+        if _shared_saver is None:
+            ttl = os.getenv("MC_CHECKPOINT_TTL_SECONDS")
+            _shared_saver = CompactingSqliteSaver.from_path(
+                path,
+                keep_last=int(os.getenv("MC_CHECKPOINT_KEEP", "10")),
+                ttl_seconds=float(ttl) if ttl else None,
+            )
+            atexit.register(_shared_saver.flush)
+        return _shared_saver
@@ -0,0 +1,155 @@
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from src.messages import message_text
+
+# Context management for the meeting agents: the last messages are sent
+# verbatim, everything older is folded into a running summary that lives in
+# the graph state (so it is checkpointed and updated incrementally: each fold
+# only feeds the previous summary plus the newly expired messages).
+
+# Messages kept verbatim after a fold.
+KEEP_LAST_MESSAGES = 6
+# Fold only once this many extra messages piled up, so the summary (and the
+# prompt prefix it is part of) stays stable for several turns.
+FOLD_STEP = 4
+
+# Per-role token budget for the verbatim tail. Over budget the oldest messages
+# are folded into the summary too, in FOLD_STEP chunks, not one by one (see
+# pending_fold), so nothing leaves the context without being summarized.
+ROLE_TOKEN_BUDGETS = {
+    "fe": 1500,
+    "ba": 1500,
+    "customer": 1000,
+}
+DEFAULT_TOKEN_BUDGET = 1500
+
+SUMMARY_PROMPT = """
+You maintain the running minutes of a product discovery meeting.
+Update the existing summary with the new messages.
+Keep every decision, open question and requirement; drop small talk.
+Answer with the updated summary only, in max 10 short bullet points, in Hungarian.
+""".strip()
+
+SUMMARY_HEADER = "Summary of the earlier part of the meeting:\n"
+
+
+def approx_tokens(text: str) -> int:
+    # ~4 characters per token is close enough for budgeting
+    return len(text) // 4 + 1
+
+
+def message_tokens(m) -> int:
+    return approx_tokens(message_text(m))
+
+
+def _speaker(m) -> str:
+    return getattr(m, "name", None) or getattr(m, "type", "user")
+
+
+def pending_fold(state, role=None):
+    # (start, end) slice of state["messages"] that should be folded now, or None.
+    # With a role, the head of the tail that is over the role's budget is
+    # folded as well.
+    messages = state["messages"]
+    upto = state.get("summary_upto", 0)
+    end = upto
+    if len(messages) - upto >= KEEP_LAST_MESSAGES + FOLD_STEP:
+        end = len(messages) - KEEP_LAST_MESSAGES
+    if role is not None:
+        end = _budget_cut(messages, end, ROLE_TOKEN_BUDGETS.get(role, DEFAULT_TOKEN_BUDGET))
+    return (upto, end) if end > upto else None
+
+
+def _budget_cut(messages, start: int, budget: int) -> int:
+    # The tail's cut only moves in FOLD_STEP jumps, so system prompt + summary
+    # + the first tail messages stay byte-identical for several turns and the
+    # provider's prompt cache can hit. A one-message sliding window would
+    # change the prefix every turn. The last message always stays verbatim.
+    tokens = [message_tokens(m) for m in messages[start:]]
+    cut = 0
+    while cut < len(tokens) - 1 and sum(tokens[cut:]) > budget:
+        cut = min(cut + FOLD_STEP, len(tokens) - 1)
+    return start + cut
+
+
+def summary_request(summary: str, messages):
+    transcript = "\n\n".join(f"{_speaker(m)}: {message_text(m)}" for m in messages)
+    return [
+        SystemMessage(content=SUMMARY_PROMPT),
+        HumanMessage(
+            content=f"Existing summary:\n{summary or '-'}\n\nNew messages:\n{transcript}"
+        ),
+    ]
+
+
+def _summary_cache_key(cache, summary: str, messages):
+    history = [(_speaker(m), message_text(m)) for m in messages]
+    return cache.make_key("summary", SUMMARY_PROMPT, summary, history)
+
+
+def fold_summary(summarizer, summary: str, messages, cache=None) -> str:
+    key = _summary_cache_key(cache, summary, messages) if cache else None
+    folded = cache.get(key) if key else None
+    if folded is None:
+        response = summarizer.invoke(summary_request(summary, messages))
+        folded = message_text(response).strip()
+        if key:
+            cache.put(key, folded)
+    return folded
+
+
+async def afold_summary(summarizer, summary: str, messages, cache=None) -> str:
+    key = _summary_cache_key(cache, summary, messages) if cache else None
+    folded = cache.get(key) if key else None
+    if folded is None:
+        response = await summarizer.ainvoke(summary_request(summary, messages))
+        folded = message_text(response).strip()
+        if key:
+            cache.put(key, folded)
+    return folded
+
+
+def build_context(state, role: str, summary: str, upto: int):
+    # Returns (messages to send, state update) for one role turn. The budget
+    # cut is already folded (pending_fold), the tail starts at summary_upto.
+    messages = state["messages"]
+    kept = messages[upto:]
+
+    context = kept
+    if summary:
+        context = [SystemMessage(content=SUMMARY_HEADER + summary)] + kept
+
+    full = sum(message_tokens(m) for m in messages)
+    sent = sum(message_tokens(m) for m in context)
+    update = {
+        "summary": summary,
+        "summary_upto": upto,
+        # delta: a State reducere összeadja (párhuzamos node-ok is írhatják)
+        "tokens_saved": max(full - sent, 0),
+    }
+    return context, update
+
+
+# folded: a fold ablak előre (spekulatívan) kiszámolt összefoglalója
+def prepare_context(state, role: str, summarizer, cache=None, folded=None):
+    summary = state.get("summary", "")
+    upto = state.get("summary_upto", 0)
+    fold = pending_fold(state, role)
+    if fold is not None:
+        start, upto = fold
+        summary = folded if folded is not None else fold_summary(
+            summarizer, summary, state["messages"][start:upto], cache
+        )
+    return build_context(state, role, summary, upto)
+
+
+async def aprepare_context(state, role: str, summarizer, cache=None, folded=None):
+    summary = state.get("summary", "")
+    upto = state.get("summary_upto", 0)
+    fold = pending_fold(state, role)
+    if fold is not None:
+        start, upto = fold
+        summary = folded if folded is not None else await afold_summary(
+            summarizer, summary, state["messages"][start:upto], cache
+        )
+    return build_context(state, role, summary, upto)
@@ -0,0 +1,54 @@
+import re
+from difflib import SequenceMatcher
+
+# Meeting convergence checks, run on every finished turn. A non-empty reason
+# ends the graph early instead of running the rest of the fixed schedule.
+
+STOP_PHRASES = (
+    "mvp agreed",
+    "ready to implement",
+)
+
+# A BA turn with at least this many bullets and no question is the
+# "summarize requirements in 2 bullets and stop" answer from its prompt.
+SUMMARY_MIN_BULLETS = 2
+
+# Same speaker saying (almost) the same thing again means the meeting loops.
+DUPLICATE_RATIO = 0.9
+DUPLICATE_LOOKBACK = 6
+
+_BULLET_RE = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+\S", re.MULTILINE)
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def is_stop_phrase(text: str) -> bool:
+    normalized = _normalize(text)
+    return any(phrase in normalized for phrase in STOP_PHRASES)
+
+
+def is_ba_summary(text: str) -> bool:
+    return "?" not in text and len(_BULLET_RE.findall(text)) >= SUMMARY_MIN_BULLETS
+
+
+def is_repetition(text: str, previous_texts) -> bool:
+    normalized = _normalize(text)
+    if not normalized:
+        return False
+    for prev in previous_texts:
+        if SequenceMatcher(None, normalized, _normalize(prev)).ratio() >= DUPLICATE_RATIO:
+            return True
+    return False
+
+
+def detect_stop(node: str, text: str, previous_texts) -> str:
+    # previous_texts: the speaker's own recent messages, newest last
+    if is_stop_phrase(text):
+        return "stop_phrase"
+    if node == "ba" and is_ba_summary(text):
+        return "ba_summary"
+    if is_repetition(text, list(previous_texts)[-DUPLICATE_LOOKBACK:]):
+        return "repetition"
+    return ""
@@ -1,17 +1,24 @@
 from typing import TypedDict, Annotated
-from langgraph.graph import StateGraph, END
+from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
 from langgraph.checkpoint.memory import InMemorySaver
 
-from langchain_openai import ChatOpenAI
 from langchain.agents import create_agent
 
 from dotenv import load_dotenv
 from pathlib import Path
 import sys
 
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
+from langchain_core.messages import HumanMessage, AIMessage, AIMessageChunk, SystemMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import merge_configs
+import asyncio
+import functools
 import hashlib
+import math
+import operator
+import os
+import time
 
 load_dotenv()
 
@@ -20,19 +27,42 @@ _root = Path(__file__).resolve().parent.parent
 if str(_root) not in sys.path:
     sys.path.insert(0, str(_root))
 
-
-def content_to_text(content):
-    # string
-    if isinstance(content, str):
-        return content
-    # Responses API: list of parts
-    if isinstance(content, list):
-        return "\n".join(
-            p.get("text", "")
-            for p in content
-            if isinstance(p, dict) and p.get("type") == "text"
-        ).strip()
-    return str(content)
+from src.llmClients import FALLBACK_ERRORS, MODEL_RETRIES, make_chat_model  # noqa: E402
+from src.contextWindow import (  # noqa: E402
+    aprepare_context,
+    approx_tokens,
+    fold_summary,
+    message_tokens,
+    pending_fold,
+    prepare_context,
+)
+from src.briefSpec import brief_hash, customer_brief, role_briefings  # noqa: E402
+from src.checkpointing import make_checkpointer  # noqa: E402
+from src.caching import LRUCache, make_response_cache  # noqa: E402
+from src.convergence import DUPLICATE_LOOKBACK, detect_stop  # noqa: E402
+from src.messages import (  # noqa: E402
+    chunk_to_text,
+    compact_message,
+    content_to_text,
+    message_text,
+)
+from src.modelScheduler import get_scheduler  # noqa: E402
+from src.schedules import default_schedule, get_routing  # noqa: E402
+from src.speculation import (  # noqa: E402
+    discard as discard_speculation,
+    speculate,
+    speculation_default,
+    take as take_speculation,
+)
+from src.telemetry import (  # noqa: E402
+    TurnTimer,
+    add_metrics,
+    emit as emit_metrics,
+    format_summary,
+    summarize,
+    turn_record,
+    usage_of,
+)
 
 
 def msg_role(m):
@@ -47,51 +77,78 @@ def msg_role(m):
     return getattr(m, "type", "unknown")
 
 
-def build_customer_agent(customer_llm, product_brief: str):
-    return create_agent(
-        model=customer_llm,
-        tools=[],
-        system_prompt=f"""
-    You are the customer of the product discovery meeting.
-    Always reply in Hungarian.
-    Always answer the business analyst's questions.
-
-    PRODUCT BRIEF:
-    {product_brief}
-    """.strip(),
+def customer_system_prompt(product_brief: str) -> str:
+    # a customer a brief szeletét kapja, ha a brief helyben parse-olható,
+    # különben a teljes briefet (src/briefSpec.py: customer_brief)
+    return (
+        "You are the customer of the product discovery meeting.\n"
+        "Always reply in Hungarian.\n"
+        "Always answer the business analyst's questions.\n\n"
+        f"PRODUCT BRIEF:\n{customer_brief(product_brief)}"
     )
 
 
+# A node-on belül hívott agent subgraph alapból a szülő checkpointerét
+# örökli, és turnönként új "fe:<task_id>" namespace-be írja a teljes
+# provider üzeneteket (tömörítés nélkül, a SQLite compaction sem éri el).
+# Az agent egy híváson belül állapotmentes, a state-et a szülő graph tartja:
+# checkpointer=False.
+def role_agent(llm, system_prompt: str):
+    return create_agent(model=llm, tools=[], system_prompt=system_prompt, checkpointer=False)
+
+
+def build_customer_agent(customer_llm, product_brief: str):
+    return role_agent(customer_llm, customer_system_prompt(product_brief))
+
+
+def _latest(old, new):
+    # "utolsó írás nyer", de egy lépésben több (párhuzamos) node is írhatja
+    return new
+
+
 class State(TypedDict):
     messages: Annotated[
         list, add_messages
     ]  # LangGraph helper: hozzáfűzi az új üzeneteket
-    turn: int  # hány "váltás" történt
-
-
-def route(state: State):
-    # 4 váltás = CUSTOMER, FE, BA, FE, BA (2 kör)
-    if state["turn"] >= 6:
-        return END
-
-    queue = [
-        "customer",
-        "fe",
-        "ba",
-        "fe",
-        "ba",
-        "customer",
-        "fe",
-        "ba",
-        "fe",
-        "ba",
-        "customer",
-        "fe",
-        "ba",
-        "fe",
-        "ba",
-    ]
-    return queue[state["turn"]]
+    turn: Annotated[int, _latest]  # hány "váltás" történt
+    # a kontextusablakból kiesett üzenetek gördülő összefoglalója
+    summary: Annotated[str, _latest]
+    summary_upto: Annotated[int, _latest]  # ennyi üzenet van már az összefoglalóban
+    # becsült megspórolt prompt tokenek a meeting során (node-onként delta)
+    tokens_saved: Annotated[int, operator.add]
+    # miért állt le korán a meeting ("" = nem állt le)
+    stop_reason: Annotated[str, _latest]
+    turns_saved: Annotated[int, _latest]  # ennyi turn maradt ki a korai leállás miatt
+    # szerepenkénti idő / token / költség összesítés; a node turn rekordokat ad
+    metrics: Annotated[dict, add_metrics]
+
+
+# A meeting schedule (szerepek sorrendje, max turn, szerepenkénti modell,
+# párhuzamos csoportok) a schedules.json-ból jön, és egyszer fordul
+# RoutingTable-lé (src/schedules.py); a router csak kikeresi a következő kört.
+
+
+def make_router(routing):
+    # szekvenciálisan a következő node, párhuzamos módban a kör node-jainak
+    # listája (a szerepei párhuzamos ágakban futnak)
+    def route(state: State):
+        nxt = routing.next_round(state)
+        if not nxt:
+            return END
+        return nxt if routing.parallel else nxt[0]
+
+    return route
+
+
+def make_parallel_entry(routing):
+    # mint szekvenciálisan: lejárt schedule után is az első szerep válaszol
+    route_round = make_router(routing)
+
+    def entry(state: State):
+        nxt = route_round(state)
+        return [routing.entry] if nxt == END else nxt
+
+    return entry
 
 
 memory = InMemorySaver()
@@ -129,73 +186,630 @@ SYSTEM_PROMPT_BUSINESS_ANALYST = """
 """
 
 
-def build_app(product_brief: str):
-    memory = InMemorySaver()
+NODE_NAMES = {
+    "fe": "frontend engineer",
+    "ba": "business analyst",
+    "customer": "customer",
+}
+
+# Provider-oldali prompt cache: az azonos prefixű kérések (role system prompt,
+# a customernél a brieffel együtt) azonos prompt_cache_key-jel mennek, hogy
+# threadek között is ugyanarra a cache-re kerüljenek. A prefix stabilitásáról
+# a contextWindow gondoskodik. MC_PROMPT_CACHE_KEY=0 kikapcsolja.
+def prompt_cache_kwargs(node: str, product_brief: str | None = None):
+    if os.getenv("MC_PROMPT_CACHE_KEY", "1") == "0":
+        return {}
+    key = f"mc-{node}"
+    if product_brief is not None:
+        key = f"{key}-{brief_hash(product_brief)}"
+    return {"extra_body": {"prompt_cache_key": key}}
+
+
+# a brieftől független system promptok
+SHARED_PROMPTS = {
+    "fe": SYSTEM_PROMPT_FRONTEND_DEVELOPER,
+    "ba": SYSTEM_PROMPT_BUSINESS_ANALYST,
+}
+
+
+def role_prompts(product_brief: str):
+    return {**SHARED_PROMPTS, "customer": customer_system_prompt(product_brief)}
+
+
+# A brieftől független részek (FE/BA agent, summarizer, HTTP kliens)
+# processzenként egyszer épülnek (szerep + modell páronként); briefenként
+# csak a customer agent új.
+@functools.cache
+def shared_agent(node: str, model: str, timeout: float | None = None):
+    timeout, retries = primary_call_limits(timeout)
+    llm = make_chat_model(
+        model,
+        temperature=0,
+        use_responses_api=True,
+        timeout=timeout,
+        max_retries=retries,
+        **prompt_cache_kwargs(node),
+    )
+    return role_agent(llm, SHARED_PROMPTS[node])
+
+
+def build_agents(product_brief: str, routing):
+    agents = {}
+    for node in routing.roles:
+        if node != "customer":
+            agents[node] = shared_agent(node, routing.models[node], routing.timeouts.get(node))
+            continue
+        timeout, retries = primary_call_limits(routing.timeouts.get(node))
+        customer_llm = make_chat_model(
+            routing.models[node],
+            temperature=0,
+            use_responses_api=True,
+            timeout=timeout,
+            max_retries=retries,
+            **prompt_cache_kwargs("customer", product_brief),
+        )
+        agents[node] = build_customer_agent(customer_llm, product_brief)
+    return agents
+
+
+# Ha az elsődleges modell a retry-ok után is időtúllépéssel, 429-cel vagy
+# 5xx-szel bukik, a turn egy tartalék modellen (src/agents.py MODEL_SPECS,
+# pl. MC_FALLBACK_MODEL=frontendDeveloperLocal) fut le, ugyanazzal a system
+# prompttal. A metrics rekord "fallback" mezője jelzi. Alapból ki van
+# kapcsolva (üres), hogy a helyi szerver nélküli telepítésekben a bukott turn
+# ne várjon még egy elérhetetlen modellre is.
+# MC_TURN_DEADLINE_SECONDS: a turn modellhívásainak közös határideje. Az
+# elsődleges modell próbánkénti timeoutja és retry száma ebből jön
+# (primary_call_limits): a próbák a határidőnek csak a fallbacknek félretett
+# MC_FALLBACK_RESERVE_SECONDS nélküli részét használhatják. A fallback
+# egyetlen próbát kap a maradék időre; ha nem maradt idő, az eredeti hiba
+# megy tovább.
+FALLBACK_MODEL = os.getenv("MC_FALLBACK_MODEL", "")
+TURN_DEADLINE_SECONDS = float(os.getenv("MC_TURN_DEADLINE_SECONDS", "60"))
+FALLBACK_RESERVE_SECONDS = float(os.getenv("MC_FALLBACK_RESERVE_SECONDS", "20"))
+
+
+def primary_call_limits(timeout: float | None):
+    # -> (timeout próbánként, max_retries) az elsődleges modellnek: a
+    # schedule timeoutja és MC_MODEL_RETRIES, de legfeljebb annyi próba,
+    # amennyi a fallback tartalék nélküli határidőbe belefér
+    budget = TURN_DEADLINE_SECONDS - (FALLBACK_RESERVE_SECONDS if FALLBACK_MODEL else 0.0)
+    budget = max(budget, 1.0)
+    timeout = min(timeout or budget, budget)
+    return timeout, max(min(MODEL_RETRIES, int(budget // timeout) - 1), 0)
+
+
+@functools.lru_cache(maxsize=32)
+def fallback_agent(system_prompt: str, timeout: float | None = None):
+    from src.agents import MODEL_SPECS
+
+    spec = dict(MODEL_SPECS[FALLBACK_MODEL])
+    llm = make_chat_model(spec.pop("model"), max_retries=0, timeout=timeout, **spec)
+    return role_agent(llm, system_prompt)
+
 
-    frontend_llm = ChatOpenAI(
-        model="gpt-4.1-nano", temperature=0, use_responses_api=True
+def fallback_model_name():
+    from src.agents import MODEL_SPECS
+
+    return MODEL_SPECS[FALLBACK_MODEL]["model"]
+
+
+def _fallback_timeout(started: float):
+    # a határidőből maradt idő egész másodpercre felfelé (a fallback agent
+    # cache-kulcsa), None = nincs már idő a fallbackre
+    remaining = TURN_DEADLINE_SECONDS - (time.perf_counter() - started)
+    if not FALLBACK_MODEL or remaining <= 0:
+        return None
+    return float(math.ceil(remaining))
+
+
+def invoke_agent(agent, system_prompt: str, payload, config):
+    # -> (eredmény, fallback volt-e)
+    started = time.perf_counter()
+    try:
+        return agent.invoke(payload, config), False
+    except FALLBACK_ERRORS as err:
+        timeout = _fallback_timeout(started)
+        if timeout is None:
+            raise
+        try:
+            return fallback_agent(system_prompt, timeout).invoke(payload, config), True
+        except Exception:
+            raise err
+
+
+async def ainvoke_agent(agent, system_prompt: str, payload, config):
+    started = time.perf_counter()
+    try:
+        return await agent.ainvoke(payload, config), False
+    except FALLBACK_ERRORS as err:
+        timeout = _fallback_timeout(started)
+        if timeout is None:
+            raise
+        try:
+            return await fallback_agent(system_prompt, timeout).ainvoke(payload, config), True
+        except Exception:
+            raise err
+
+
+# Minden agent hívás a folyamat-szintű modelScheduleren megy át, így a
+# UI sessionök, a szerver meetingjei és a batch jobok egy közös
+# konkurencia/TPM budgeten osztoznak. Meeting = thread_id, prioritás = a
+# configurable "priority" kulcsa (alap: interactive, a batchRunner "batch").
+# A becslés a kontextusból + a várható válaszhosszból jön, a hívás után a
+# tényleges usage-dzsel korrigáljuk.
+SCHED_OUTPUT_ESTIMATE = 400
+
+
+def schedule_request(config, system_prompt: str, context):
+    conf = (config or {}).get("configurable", {})
+    estimate = (
+        approx_tokens(system_prompt)
+        + sum(message_tokens(m) for m in context)
+        + SCHED_OUTPUT_ESTIMATE
     )
-    ba_llm = ChatOpenAI(model="gpt-4.1-nano", temperature=0, use_responses_api=True)
-    customer_llm = ChatOpenAI(
-        model="gpt-4.1-nano", temperature=0, use_responses_api=True
+    return conf.get("thread_id", "default"), conf.get("priority", "interactive"), estimate
+
+
+def _used_tokens(message):
+    usage = usage_of(message)
+    return usage["input_tokens"] + usage["output_tokens"]
+
+
+@functools.cache
+def build_summarizer():
+    # "nostream": az összefoglaló tokenjei ne kerüljenek a meeting streambe
+    return make_chat_model(
+        "gpt-4.1-nano", temperature=0, use_responses_api=True, **prompt_cache_kwargs("summary")
+    ).with_config(tags=["nostream"])
+
+
+def _turn_update(node: str, state: State, content, routing):
+    # párhuzamos körben minden node a kör végét írja be
+    turn = state["turn"] + len(routing.round_at(state["turn"]))
+    update = {
+        # csak név + szöveg kerül a state-be/checkpointba, provider metadata nélkül
+        "messages": [compact_message(content, NODE_NAMES[node])],
+        "turn": turn,
+    }
+
+    # csak a detect_stop által nézett utolsó saját üzenetek, hátulról: a
+    # költség nem nő a meeting hosszával
+    own_previous = []
+    for m in reversed(state["messages"]):
+        if getattr(m, "name", None) == NODE_NAMES[node]:
+            own_previous.append(message_text(m))
+            if len(own_previous) == DUPLICATE_LOOKBACK:
+                break
+    own_previous.reverse()
+    reason = detect_stop(node, content_to_text(content), own_previous)
+    if reason and turn < routing.max_turns:
+        update["stop_reason"] = reason
+        update["turns_saved"] = routing.max_turns - turn
+    return update
+
+
+def response_cache_key(cache, node: str, model: str, system_prompt: str, context):
+    prompt_hash = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()
+    history = [
+        (msg_role(m), getattr(m, "name", None), message_text(m))
+        for m in context
+    ]
+    return cache.make_key(node, prompt_hash, model, history)
+
+
+def _finish_turn(
+    node,
+    state,
+    content,
+    routing,
+    update,
+    timer,
+    message,
+    cache_hit,
+    fallback=False,
+    queue_wait=0.0,
+    speculation=None,
+    spec_saved=0.0,
+):
+    record = turn_record(
+        node,
+        fallback_model_name() if fallback else routing.models[node],
+        state["turn"],
+        time.perf_counter() - timer.started,
+        timer.ttft,
+        message,
+        cache_hit=cache_hit,
+        fallback=fallback,
+        queue_wait=queue_wait,
+        speculation=speculation,
+        spec_saved=spec_saved,
     )
+    emit_metrics(record)
+    return {
+        **update,
+        **_turn_update(node, state, content, routing),
+        "metrics": [record],
+    }
+
 
-    frontend_agent = create_agent(
-        model=frontend_llm,
-        tools=[],
-        system_prompt=SYSTEM_PROMPT_FRONTEND_DEVELOPER,
+# Egy turn modellválasza: response cache, különben a scheduleren át az
+# agent. -> (szöveg, üzenet, fallback volt-e, sorban várt idő); üzenet
+# None = cache találat.
+def _reply(node, agent, system_prompt: str, cache, routing, context, config):
+    key = (
+        response_cache_key(cache, node, routing.models[node], system_prompt, context)
+        if cache
+        else None
     )
+    content = cache.get(key) if key else None
+    if content is not None:
+        return content, None, False, 0.0
+    with get_scheduler().slot(*schedule_request(config, system_prompt, context)) as ticket:
+        result, fallback = invoke_agent(agent, system_prompt, {"messages": context}, config)
+    message = result["messages"][-1]
+    ticket.report(_used_tokens(message))
+    content = message_text(message)
+    # a helyi modell válasza ne kerüljön az elsődleges modell kulcsa alá
+    if key and not fallback:
+        cache.put(key, content)
+    return content, message, fallback, ticket.wait
 
-    ba_agent = create_agent(
-        model=ba_llm,
-        tools=[],
-        system_prompt=SYSTEM_PROMPT_BUSINESS_ANALYST,
+
+async def _areply(node, agent, system_prompt: str, cache, routing, context, config):
+    key = (
+        response_cache_key(cache, node, routing.models[node], system_prompt, context)
+        if cache
+        else None
     )
+    content = cache.get(key) if key else None
+    if content is not None:
+        return content, None, False, 0.0
+    async with get_scheduler().aslot(*schedule_request(config, system_prompt, context)) as ticket:
+        result, fallback = await ainvoke_agent(
+            agent, system_prompt, {"messages": context}, config
+        )
+    message = result["messages"][-1]
+    ticket.report(_used_tokens(message))
+    content = message_text(message)
+    if key and not fallback:
+        cache.put(key, content)
+    return content, message, fallback, ticket.wait
 
-    customer_agent = build_customer_agent(customer_llm, product_brief)
 
-    def fe_node(state: State):
-        result = frontend_agent.invoke({"messages": state["messages"]})
-        last = result["messages"][-1]
-        return {
-            "messages": [AIMessage(content=last.content, name="frontend engineer")],
-            "turn": state["turn"] + 1,
-        }
+def _with_briefing(briefing, context):
+    # a szerep brief-szelete a közös system prompt után, a summary/tail előtt:
+    # briefenként stabil prefix, így a provider prompt cache is talál
+    return [SystemMessage(content=briefing), *context] if briefing else context
+
+
+# --------- spekulatív előre dolgozás (src/speculation.py) ---------
+def _spec_key(config, node: str, turn: int):
+    return ((config or {}).get("configurable", {}).get("thread_id", "default"), node, turn)
+
+
+def _next_solo(node: str, state, routing):
+    # a következő kör egyetlen szerepe, ha a mostani kör csak ez a node
+    turn = state["turn"]
+    if routing.round_at(turn) != [node] or turn + 1 >= routing.max_turns:
+        return None
+    nxt = routing.round_at(turn + 1)
+    return nxt[0] if len(nxt) == 1 else None
 
-    def ba_node(state: State):
-        result = ba_agent.invoke({"messages": state["messages"]})
-        last = result["messages"][-1]
-        return {
-            "messages": [AIMessage(content=last.content, name="business analyst")],
-            "turn": state["turn"] + 1,
-        }
 
-    def customer_node(state: State):
-        result = customer_agent.invoke({"messages": state["messages"]})
-        last = result["messages"][-1]
-        return {
-            "messages": [AIMessage(content=last.content, name="customer")],
-            "turn": state["turn"] + 1,
+# update: a mostani node kontextus-frissítése (summary, summary_upto); a
+# spekuláció a node saját foldja után indul, és azt használja tovább
+def _speculate_next(node: str, state, update, config, routing, roster, summarizer, cache):
+    nxt = _next_solo(node, state, routing)
+    if nxt is None:
+        return
+    folded_now = update["summary_upto"] != state.get("summary_upto", 0)
+    # a node-ok state-je pillanatkép, de a háttérmunka saját másolatot kap
+    state = {
+        **state,
+        "messages": list(state["messages"]),
+        "summary": update["summary"],
+        "summary_upto": update["summary_upto"],
+    }
+    base = len(state["messages"])
+    key = _spec_key(config, nxt, state["turn"] + 1)
+    if routing.independent(node, nxt):
+        agent, system_prompt, briefing = roster[nxt]
+        # a node callbackjei nélkül: a tokenek ne kerüljenek a mostani node streamjébe
+        conf = config.get("configurable", {})
+        spec_config = {
+            "configurable": {
+                "thread_id": conf.get("thread_id", "default"),
+                "priority": conf.get("priority", "interactive"),
+            }
         }
 
-    g = StateGraph(State)
-    g.add_node("fe", fe_node)
-    g.add_node("ba", ba_node)
-    g.add_node("customer", customer_node)
+        def generate():
+            context, update = prepare_context(state, nxt, summarizer, cache)
+            context = _with_briefing(briefing, context)
+            reply = _reply(nxt, agent, system_prompt, cache, routing, context, spec_config)
+            return update, reply
+
+        speculate(key, "generate", node, base, None, generate)
+        return
+    # a következő turn foldja a mostani válasz előtti üzeneteket fedi le; a
+    # budget miatti foldot a még ismeretlen válasz dönti el, azt nem találgatjuk
+    # (ha a claimnél a budget is foldolna, a spekuláció miss). Ha a mostani
+    # node épp foldolt, a következőnek nem lesz mit.
+    if folded_now:
+        return
+    fold = pending_fold({**state, "messages": [*state["messages"], None]})
+    if fold is not None:
+        start, upto = fold
+        summary, folded = state.get("summary", ""), state["messages"][start:upto]
+        speculate(
+            key, "fold", node, base, fold, lambda: fold_summary(summarizer, summary, folded, cache)
+        )
+
 
-    g.set_entry_point("customer")
-    g.add_conditional_edges(
-        "fe", route, {"fe": "fe", "ba": "ba", "customer": "customer", END: END}
+def _claim_speculation(node: str, state, config):
+    # -> (Speculation vagy None, "hit" / "miss" / None)
+    spec = take_speculation(_spec_key(config, node, state["turn"]))
+    if spec is None:
+        return None, None
+    messages = state["messages"]
+    valid = (
+        len(messages) == spec.base + 1
+        and getattr(messages[-1], "name", None) == NODE_NAMES[spec.after]
+        and (spec.kind == "generate" or pending_fold(state, node) == spec.fold)
     )
-    g.add_conditional_edges(
-        "ba", route, {"fe": "fe", "ba": "ba", "customer": "customer", END: END}
+    if not valid:
+        spec.discard()
+        return None, "miss"
+    return spec, "hit"
+
+
+def _discard_next(node: str, state, config, routing):
+    # korai leállásnál a következő turn nem jön el
+    nxt = _next_solo(node, state, routing)
+    if nxt is not None:
+        discard_speculation(_spec_key(config, nxt, state["turn"] + 1))
+
+
+# Az agentek a node-on belül futnak, így "messages" stream módban a
+# modell tokenjei a node namespace-ében (pl. "fe:<task_id>") jönnek ki.
+# Cache találatnál nincs token, a kész üzenet az "updates" streamben jön;
+# ugyanígy a spekulatívan előre generált válasznál.
+# A node configját továbbadjuk (merge_configs), hogy a TurnTimer a szülő
+# callbackjei mellé kerüljön, ne helyettük.
+# roster: {node: (agent, system prompt, briefing)} spekulatív módban, különben None.
+# briefing: a brief szerepre szabott szelete (src/briefSpec.py) vagy None.
+def make_node(
+    node: str,
+    agent,
+    summarizer,
+    system_prompt: str,
+    cache,
+    routing,
+    roster=None,
+    briefing=None,
+):
+    def run(state: State, config: RunnableConfig):
+        timer = TurnTimer()
+        spec, speculation = _claim_speculation(node, state, config)
+
+        prefetched, spec_saved = None, 0.0
+        if spec is not None:
+            requested = time.perf_counter()
+            try:
+                prefetched = spec.future.result()
+            except Exception:
+                speculation = "miss"
+            else:
+                spec_saved = spec.saved(requested)
+
+        reply = None
+        if prefetched is not None and spec.kind == "generate":
+            update, reply = prefetched
+        else:
+            context, update = prepare_context(
+                state, node, summarizer, cache, folded=prefetched
+            )
+        if roster is not None:
+            _speculate_next(node, state, update, config, routing, roster, summarizer, cache)
+
+        if reply is not None:
+            content, message, fallback, queue_wait = reply
+        else:
+            context = _with_briefing(briefing, context)
+            content, message, fallback, queue_wait = _reply(
+                node,
+                agent,
+                system_prompt,
+                cache,
+                routing,
+                context,
+                merge_configs(config, {"callbacks": [timer]}),
+            )
+        out = _finish_turn(
+            node,
+            state,
+            content,
+            routing,
+            update,
+            timer,
+            message,
+            message is None,
+            fallback,
+            queue_wait,
+            speculation,
+            spec_saved,
+        )
+        if roster is not None and out.get("stop_reason"):
+            _discard_next(node, state, config, routing)
+        return out
+
+    return run
+
+
+def make_async_node(
+    node: str,
+    agent,
+    summarizer,
+    system_prompt: str,
+    cache,
+    routing,
+    roster=None,
+    briefing=None,
+):
+    async def run(state: State, config: RunnableConfig):
+        timer = TurnTimer()
+        spec, speculation = _claim_speculation(node, state, config)
+
+        prefetched, spec_saved = None, 0.0
+        if spec is not None:
+            requested = time.perf_counter()
+            try:
+                prefetched = await asyncio.wrap_future(spec.future)
+            except Exception:
+                speculation = "miss"
+            else:
+                spec_saved = spec.saved(requested)
+
+        reply = None
+        if prefetched is not None and spec.kind == "generate":
+            update, reply = prefetched
+        else:
+            context, update = await aprepare_context(
+                state, node, summarizer, cache, folded=prefetched
+            )
+        if roster is not None:
+            _speculate_next(node, state, update, config, routing, roster, summarizer, cache)
+
+        if reply is not None:
+            content, message, fallback, queue_wait = reply
+        else:
+            context = _with_briefing(briefing, context)
+            content, message, fallback, queue_wait = await _areply(
+                node,
+                agent,
+                system_prompt,
+                cache,
+                routing,
+                context,
+                merge_configs(config, {"callbacks": [timer]}),
+            )
+        out = _finish_turn(
+            node,
+            state,
+            content,
+            routing,
+            update,
+            timer,
+            message,
+            message is None,
+            fallback,
+            queue_wait,
+            speculation,
+            spec_saved,
+        )
+        if roster is not None and out.get("stop_reason"):
+            _discard_next(node, state, config, routing)
+        return out
+
+    return run
+
+
+def compile_graph(nodes: dict, checkpointer, routing=None):
+    routing = routing or get_routing()
+    g = StateGraph(State)
+    for name, node in nodes.items():
+        g.add_node(name, node)
+
+    path_map = {name: name for name in nodes}
+    path_map[END] = END
+
+    route = make_router(routing)
+    if not routing.parallel:
+        g.set_entry_point(routing.entry)
+    else:
+        # a router listát ad vissza -> a kör szerepei párhuzamos ágakban futnak,
+        # az üzeneteiket az add_messages determinisztikus sorrendben fűzi hozzá
+        g.add_conditional_edges(START, make_parallel_entry(routing), path_map)
+    for name in nodes:
+        g.add_conditional_edges(name, route, path_map)
+
+    return g.compile(checkpointer=checkpointer)
+
+
+def _parallel_default() -> bool:
+    return os.getenv("MC_PARALLEL_ROUNDS", "").lower() in ("1", "true", "yes")
+
+
+def _build(
+    product_brief, node_factory, checkpointer, response_cache, parallel, schedule, speculative
+):
+    memory = checkpointer if checkpointer is not None else make_checkpointer()
+    cache = response_cache if response_cache is not None else make_response_cache()
+    routing = get_routing(schedule, _parallel_default() if parallel is None else parallel)
+    agents = build_agents(product_brief, routing)
+    prompts = role_prompts(product_brief)
+    summarizer = build_summarizer()
+    speculative = speculation_default() if speculative is None else speculative
+    # pre-meeting lépés: a brief specje briefenként egyszer készül (cache)
+    briefings = role_briefings(product_brief)
+    roster = (
+        {name: (agents[name], prompts[name], briefings.get(name)) for name in agents}
+        if speculative
+        else None
     )
-    g.add_conditional_edges(
-        "customer", route, {"fe": "fe", "ba": "ba", "customer": "customer", END: END}
+    nodes = {
+        name: node_factory(
+            name,
+            agent,
+            summarizer,
+            prompts[name],
+            cache,
+            routing,
+            roster,
+            briefings.get(name),
+        )
+        for name, agent in agents.items()
+    }
+    return compile_graph(nodes, memory, routing)
+
+
+# schedule: a schedules.json egy neve (None = MC_SCHEDULE / a config default-ja)
+# speculative: a következő szerep turnjének előre dolgozása (None = MC_SPECULATION)
+def build_app(
+    product_brief: str,
+    *,
+    checkpointer=None,
+    response_cache=None,
+    parallel=None,
+    schedule=None,
+    speculative=None,
+):
+    return _build(
+        product_brief, make_node, checkpointer, response_cache, parallel, schedule, speculative
     )
 
-    app = g.compile(checkpointer=memory)
-    return app
+
+# Async változat: a node-ok ainvoke-ot használnak, így egy event loop sok
+# meetinget tud párhuzamosan futtatni szálanként egy helyett.
+def build_async_app(
+    product_brief: str,
+    *,
+    checkpointer=None,
+    response_cache=None,
+    parallel=None,
+    schedule=None,
+    speculative=None,
+):
+    return _build(
+        product_brief,
+        make_async_node,
+        checkpointer,
+        response_cache,
+        parallel,
+        schedule,
+        speculative,
+    )
 
 
 PRODUCT_BRIEF = """
@@ -211,50 +825,225 @@ PRODUCT_BRIEF = """
 """
 
 
-def run_conversation(
-    app, user_message: str, thread_id: str, *, is_new_thread: bool = False
-):
+class TurnTracker:
+    # (namespace, mode, data) stream elemekből token / kész turn eventek:
+    #   {"type": "token", "node", "text"}
+    #   {"type": "message", "node", "message", "ttft", "elapsed"}
+    # ttft: turn kezdetétől az első tokenig (None, ha nem volt token),
+    # elapsed: a teljes turn ideje. Párhuzamos körben a node-ok tokenjei
+    # keveredhetnek; a kezdőidőt node-onként az első tokennél rögzítjük.
+    def __init__(self):
+        self.turn_start = time.perf_counter()
+        self.started = {}  # node -> (turn kezdete, első token ideje)
+
+    def feed(self, ns, mode, data):
+        if mode == "messages":
+            chunk, _metadata = data
+            # a node-ok saját AIMessage-ei is megjelennek itt, csak a chunk kell
+            if not ns or not isinstance(chunk, AIMessageChunk):
+                return []
+            text = chunk_to_text(chunk.content)
+            if not text:
+                return []
+            node = ns[0].split(":")[0]
+            self.started.setdefault(node, (self.turn_start, time.perf_counter()))
+            return [{"type": "token", "node": node, "text": text}]
+
+        # belső (agent) subgraph frissítések nem érdekesek
+        if ns:
+            return []
+
+        now = time.perf_counter()
+        events = []
+        for node, partial in data.items():
+            if not isinstance(partial, dict):
+                continue
+            msgs = partial.get("messages") or []
+            if not msgs or not isinstance(msgs[-1], AIMessage):
+                continue
+            start, first_token = self.started.pop(node, (self.turn_start, None))
+            events.append(
+                {
+                    "type": "message",
+                    "node": node,
+                    "message": msgs[-1],
+                    "ttft": first_token - start if first_token is not None else None,
+                    "elapsed": now - start,
+                    # a node által mért rekordok (idő, tokenek, költség)
+                    "metrics": partial.get("metrics") or [],
+                }
+            )
+        if not self.started:
+            self.turn_start = now
+        return events
+
+
+STREAM_MODES = ["messages", "updates"]
+
+
+def stream_turns(app, initial, config):
+    tracker = TurnTracker()
+    for ns, mode, data in app.stream(
+        initial, config=config, stream_mode=STREAM_MODES, subgraphs=True
+    ):
+        yield from tracker.feed(ns, mode, data)
+
+
+async def astream_turns(app, initial, config):
+    tracker = TurnTracker()
+    async for ns, mode, data in app.astream(
+        initial, config=config, stream_mode=STREAM_MODES, subgraphs=True
+    ):
+        for event in tracker.feed(ns, mode, data):
+            yield event
+
+
+def format_timing(event) -> str:
+    ttft = event["ttft"]
+    ttft_text = f"{ttft:.2f}s" if ttft is not None else "n/a"
+    return f"TTFT {ttft_text}, turn {event['elapsed']:.2f}s"
+
+
+class TurnPrinter:
+    # Egyszerre egy node tokenjeit írja ki élőben; párhuzamos körben a többi
+    # node tokenjei pufferbe kerülnek és az aktuális turn után jelennek meg.
+    def __init__(self):
+        self.streaming_node = None
+        self.pending = {}  # node -> pufferelt szöveg
+        self.ttfts = []
+        self.metrics = []
+
+    def _start(self, node):
+        self.streaming_node = node
+        print(f"\n🤖 {NODE_NAMES.get(node, node).upper()}:")
+
+    def handle(self, event):
+        node = event["node"]
+
+        if event["type"] == "token":
+            if self.streaming_node is None:
+                self._start(node)
+            if node == self.streaming_node:
+                print(event["text"], end="", flush=True)
+            else:
+                self.pending[node] = self.pending.get(node, "") + event["text"]
+            return
+
+        if node == self.streaming_node:
+            self.streaming_node = None
+        else:
+            # nem élőben streamelt (cache, puffer) -> teljes szöveg egyben
+            self.pending.pop(node, None)
+            who = NODE_NAMES.get(node, node).upper()
+            print(f"\n🤖 {who}:\n{message_text(event['message'])}", end="")
+        print(f"\n   ⏱ {format_timing(event)}")
+        if event["ttft"] is not None:
+            self.ttfts.append(event["ttft"])
+        self.metrics.extend(event["metrics"])
+
+        if self.streaming_node is None and self.pending:
+            nxt = next(iter(self.pending))
+            self._start(nxt)
+            print(self.pending.pop(nxt), end="", flush=True)
+
+    def summary(self):
+        if self.ttfts:
+            avg = sum(self.ttfts) / len(self.ttfts)
+            print(f"\n⏱ avg TTFT {avg:.2f}s over {len(self.ttfts)} turns")
+        if self.metrics:
+            print("📊 per-role metrics:")
+            print(format_summary(summarize(self.metrics)))
+
+
+# saved_before: a thread tokens_saved értéke a futás előtt (a State reducere
+# a thread teljes élettartama alatt összead, a riport csak ezt a futást mutatja)
+def print_context_report(state, saved_before: int = 0):
+    saved = state.get("tokens_saved", 0) - saved_before
+    folded = state.get("summary_upto", 0)
+    if saved or folded:
+        print(
+            f"🧮 context: ~{saved} prompt tokens saved this run, "
+            f"{folded} messages of the thread folded into the summary"
+        )
+
+
+def print_stop_report(state):
+    if state.get("stop_reason"):
+        print(
+            f"⏹ meeting stopped early ({state['stop_reason']}), "
+            f"{state.get('turns_saved', 0)} turns saved"
+        )
+
+
+def _initial_input(user_message: str, is_new_thread: bool):
+    # stop_reason reset: az új user üzenet újraindítja a meetinget
     initial = {
         "messages": [{"role": "user", "content": user_message}],
+        "stop_reason": "",
+        "turns_saved": 0,
     }
     if is_new_thread:
         initial["turn"] = 0
+    return initial
 
-    last_printed_id = None
-    final_state = None
 
-    for state in app.stream(
-        initial,
-        config={"configurable": {"thread_id": thread_id}},
-        stream_mode="values",
-    ):
-        final_state = state
-        last = state["messages"][-1]
+def run_conversation(
+    app, user_message: str, thread_id: str, *, is_new_thread: bool = False
+):
+    initial = _initial_input(user_message, is_new_thread)
+    config = {"configurable": {"thread_id": thread_id}}
+    print(f"\n👤 USER:\n{user_message}")
 
-        mid = getattr(last, "id", None)
-        if mid and mid == last_printed_id:
-            continue
-        last_printed_id = mid
+    saved_before = app.get_state(config).values.get("tokens_saved", 0)
+    printer = TurnPrinter()
+    for event in stream_turns(app, initial, config):
+        printer.handle(event)
+    printer.summary()
 
-        if isinstance(last, AIMessage):
-            who = (getattr(last, "name", None) or "assistant").upper()
-            print(f"\n🤖 {who}:\n{content_to_text(last.content)}")
-        elif isinstance(last, HumanMessage):
-            print(f"\n👤 USER:\n{content_to_text(last.content)}")
+    final_state = app.get_state(config).values
+    print_context_report(final_state, saved_before)
+    print_stop_report(final_state)
+    return final_state
 
+
+async def arun_conversation(
+    app, user_message: str, thread_id: str, *, is_new_thread: bool = False
+):
+    initial = _initial_input(user_message, is_new_thread)
+    config = {"configurable": {"thread_id": thread_id}}
+    print(f"\n👤 USER:\n{user_message}")
+
+    saved_before = (await app.aget_state(config)).values.get("tokens_saved", 0)
+    printer = TurnPrinter()
+    async for event in astream_turns(app, initial, config):
+        printer.handle(event)
+    printer.summary()
+
+    final_state = (await app.aget_state(config)).values
+    print_context_report(final_state, saved_before)
+    print_stop_report(final_state)
     return final_state
 
 
-_APP_CACHE = {}
+# Korlátos LRU cache a lefordított appokhoz, csúszó TTL-lel (az utolsó
+# használattól számít). A checkpointer processz-szintű (make_checkpointer),
+# így egy kiesett app újraépítve is megtalálja a threadjeit.
+_APP_CACHE = LRUCache(
+    maxsize=int(os.getenv("MC_APP_CACHE_SIZE", "16")),
+    ttl=float(os.getenv("MC_APP_CACHE_TTL_SECONDS", "3600")),
+)
 
 
-def get_app(product_brief: str):
-    brief_hash = hashlib.sha256(product_brief.encode("utf-8")).hexdigest()[:12]
+def get_app(product_brief: str, schedule: str | None = None):
+    schedule = schedule or default_schedule()
+    return _APP_CACHE.get_or_create(
+        f"{brief_hash(product_brief)}:{schedule}",
+        lambda: build_app(product_brief, schedule=schedule),
+    )
 
-    if brief_hash not in _APP_CACHE:
-        _APP_CACHE[brief_hash] = build_app(product_brief)
 
-    return _APP_CACHE[brief_hash]
+def app_cache_stats():
+    return _APP_CACHE.stats()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,141 @@
+import asyncio
+import hashlib
+import threading
+import time
+from typing import Any
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+# Deterministic offline stand-in for ChatOpenAI. Replies are derived from a
+# hash of the prompt, so the same history always gives the same answer, and
+# latency is simulated (time to first token + per-token delay) so the graph
+# orchestration cost can be measured without network access.
+
+_VOCABULARY = (
+    "landing oldal checkout kosár termék ár fizetés stripe szállítás email "
+    "visszaigazolás mobil gyors komponens űrlap mező validáció gomb lépés "
+    "adat tárolás lista kép vélemény gyik előny design teszt mock api "
+    "rendelés cím név telefon összeg státusz hiba üzenet oldalsáv fejléc "
+    "lábléc ikon szín betű kontraszt cache build deploy"
+).split()
+
+_busy_lock = threading.Lock()
+_busy_seconds = 0.0
+
+
+def busy_seconds() -> float:
+    # total simulated model time across all fake models in this process
+    with _busy_lock:
+        return _busy_seconds
+
+
+def reset_busy_seconds():
+    global _busy_seconds
+    with _busy_lock:
+        _busy_seconds = 0.0
+
+
+def _add_busy(seconds: float):
+    global _busy_seconds
+    with _busy_lock:
+        _busy_seconds += seconds
+
+
+class FakeChatModel(BaseChatModel):
+    model_name: str = "fake-model"
+    first_token_latency: float = 0.0
+    token_latency: float = 0.0
+    output_tokens: int = 24
+    reply: str | None = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    @property
+    def _identifying_params(self):
+        return {"model_name": self.model_name}
+
+    def bind_tools(self, tools, **kwargs: Any):
+        return self
+
+    def _tokens(self, messages):
+        if self.reply is not None:
+            words = self.reply.split(" ")
+            return [w if i == 0 else " " + w for i, w in enumerate(words)]
+
+        prompt = "\n".join(str(m.content) for m in messages)
+        seed = hashlib.sha256(f"{self.model_name}\n{prompt}".encode("utf-8")).digest()
+        tokens = []
+        for i in range(self.output_tokens):
+            word = _VOCABULARY[seed[i % len(seed)] * (i + 1) % len(_VOCABULARY)]
+            tokens.append(word if i == 0 else " " + word)
+        return tokens
+
+    def _usage(self, messages, tokens):
+        prompt_tokens = sum(len(str(m.content)) // 4 + 1 for m in messages)
+        return {
+            "input_tokens": prompt_tokens,
+            "output_tokens": len(tokens),
+            "total_tokens": prompt_tokens + len(tokens),
+        }
+
+    def _plan(self, messages):
+        # (tokens, first token latency, per-token latency, usage); subclasses
+        # (e.g. replay.PlaybackChatModel) override this to script the reply
+        tokens = self._tokens(messages)
+        return tokens, self.first_token_latency, self.token_latency, self._usage(messages, tokens)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        tokens, first_latency, token_latency, usage = self._plan(messages)
+        delay = first_latency + token_latency * len(tokens)
+        time.sleep(delay)
+        _add_busy(delay)
+        message = AIMessage(content="".join(tokens), usage_metadata=usage)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        tokens, first_latency, token_latency, usage = self._plan(messages)
+        delay = first_latency + token_latency * len(tokens)
+        await asyncio.sleep(delay)
+        _add_busy(delay)
+        message = AIMessage(content="".join(tokens), usage_metadata=usage)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        tokens, first_latency, token_latency, usage = self._plan(messages)
+        time.sleep(first_latency)
+        _add_busy(first_latency)
+        for i, token in enumerate(tokens):
+            if i:
+                time.sleep(token_latency)
+                _add_busy(token_latency)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=usage))
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        tokens, first_latency, token_latency, usage = self._plan(messages)
+        await asyncio.sleep(first_latency)
+        _add_busy(first_latency)
+        for i, token in enumerate(tokens):
+            if i:
+                await asyncio.sleep(token_latency)
+                _add_busy(token_latency)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=usage))
+
+
+def fake_model_factory(**settings):
+    # make_chat_model-kompatibilis factory; a ChatOpenAI kwargokat eldobja
+    def factory(model: str, **_kwargs):
+        return FakeChatModel(model_name=model, **settings)
+
+    return factory
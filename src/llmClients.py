@@ -0,0 +1,118 @@
+import os
+import threading
+
+import httpx
+import openai
+from openai import DefaultAsyncHttpxClient, DefaultHttpxClient
+from langchain_openai import ChatOpenAI
+
+
+# Process-wide HTTP connection pool shared by every role model, so concurrent
+# meetings reuse keep-alive TLS connections instead of opening new ones per
+# ChatOpenAI instance. Limits come from the environment (or
+# configure_http_pool() before the first model is built).
+#
+# Note: the async client is bound to the event loop it first runs on; drive
+# the async apps from one long-lived loop (e.g. a server), not asyncio.run()
+# per request.
+_POOL_CONFIG = {
+    "max_connections": int(os.getenv("MC_HTTP_MAX_CONNECTIONS", "100")),
+    "max_keepalive_connections": int(os.getenv("MC_HTTP_MAX_KEEPALIVE", "20")),
+    "keepalive_expiry": float(os.getenv("MC_HTTP_KEEPALIVE_EXPIRY", "30")),
+}
+
+# Bounded retries per model call; the openai client backs off exponentially
+# with jitter between attempts (and honours Retry-After on 429s).
+MODEL_RETRIES = int(os.getenv("MC_MODEL_RETRIES", "2"))
+
+# Client-side token bucket shared by every model in the process, so many
+# concurrent meetings queue locally instead of all hitting 429s at once.
+# MC_RATE_LIMIT_RPS=0 (default) turns it off.
+_RATE_LIMIT = {
+    "requests_per_second": float(os.getenv("MC_RATE_LIMIT_RPS", "0")),
+    "max_bucket_size": int(os.getenv("MC_RATE_LIMIT_BURST", "10")),
+}
+
+# Errors that are still failing after the retries: the caller may fall back
+# to another model for the turn.
+FALLBACK_ERRORS = (
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+_lock = threading.Lock()
+_http_client = None
+_http_async_client = None
+_rate_limiter = None
+
+# Optional stand-in for ChatOpenAI (benchmarks, offline runs):
+# factory(model_name, **chat_openai_kwargs) -> BaseChatModel
+_model_factory = None
+
+
+def configure_http_pool(**limits):
+    unknown = set(limits) - set(_POOL_CONFIG)
+    if unknown:
+        raise ValueError(f"Unknown HTTP pool settings: {sorted(unknown)}")
+    with _lock:
+        if _http_client is not None or _http_async_client is not None:
+            raise RuntimeError("HTTP pool already in use; configure it before building models")
+        _POOL_CONFIG.update(limits)
+
+
+def _limits():
+    return httpx.Limits(**_POOL_CONFIG)
+
+
+def get_http_client():
+    global _http_client
+    with _lock:
+        if _http_client is None:
+            _http_client = DefaultHttpxClient(limits=_limits())
+        return _http_client
+
+
+def get_async_http_client():
+    global _http_async_client
+    with _lock:
+        if _http_async_client is None:
+            _http_async_client = DefaultAsyncHttpxClient(limits=_limits())
+        return _http_async_client
+
+
+def get_rate_limiter():
+    global _rate_limiter
+    if _RATE_LIMIT["requests_per_second"] <= 0:
+        return None
+    with _lock:
+        if _rate_limiter is None:
+            from langchain_core.rate_limiters import InMemoryRateLimiter
+
+            _rate_limiter = InMemoryRateLimiter(check_every_n_seconds=0.05, **_RATE_LIMIT)
+        return _rate_limiter
+
+
+def set_chat_model_factory(factory):
+    # None visszaállítja a valódi ChatOpenAI-t
+    global _model_factory
+    _model_factory = factory
+
+
+def make_chat_model(model: str, **kwargs):
+    kwargs.setdefault("max_retries", MODEL_RETRIES)
+    limiter = get_rate_limiter()
+    if limiter is not None:
+        kwargs.setdefault("rate_limiter", limiter)
+    if _model_factory is not None:
+        return _model_factory(model, **kwargs)
+    return openai_chat_model(model, **kwargs)
+
+
+def openai_chat_model(model: str, **kwargs):
+    # the real ChatOpenAI on the shared pool, regardless of the factory hook
+    # (factories that wrap it, e.g. replay.record_to, call this directly)
+    kwargs.setdefault("http_client", get_http_client())
+    kwargs.setdefault("http_async_client", get_async_http_client())
+    return ChatOpenAI(model=model, **kwargs)
@@ -0,0 +1,306 @@
+import argparse
+import json
+import os
+import sys
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from uuid import uuid4
+
+_root = Path(__file__).resolve().parent.parent
+if str(_root) not in sys.path:
+    sys.path.insert(0, str(_root))
+
+from src.briefSpec import brief_spec_stats  # noqa: E402
+from src.caching import LRUCache  # noqa: E402
+from src.conversationBuilder import (  # noqa: E402
+    NODE_NAMES,
+    app_cache_stats,
+    brief_hash,
+    get_app,
+    message_text,
+    stream_turns,
+)
+from src.modelScheduler import scheduler_stats  # noqa: E402
+from src.schedules import get_routing  # noqa: E402
+from src.telemetry import state_summary  # noqa: E402
+
+# Meeting HTTP/SSE server:
+#   python src/meetingServer.py --port 8000 --max-streams 8
+#
+#   POST /meetings                {"brief": "...", "schedule": "..."}
+#                                 -> {"meeting_id", "brief_hash", "schedule"}
+#   POST /meetings/<id>/messages  {"message": "..."} -> text/event-stream
+#        event: token    {"node", "text"}
+#        event: message  {"node", "speaker", "text", "ttft", "elapsed", "metrics"}
+#        event: done     {"stop_reason", "turns_saved"}
+#        event: error    {"error"}
+#   GET  /meetings/<id>           -> transcript, stop_reason, metrics summary
+#   GET  /health                  -> streams, app/brief spec cache, scheduler stats
+#
+# Egy meetingre egyszerre egy üzenet futhat (409, ha már fut egy), hogy a
+# checkpointer threadjébe ne írjon két stream párhuzamosan. A futó streamek
+# számát egy szemafor korlátozza; ha megtelt, 503 + Retry-After a válasz.
+
+MAX_STREAMS = int(os.getenv("MC_SERVER_MAX_STREAMS", "8"))
+QUEUE_TIMEOUT = float(os.getenv("MC_SERVER_QUEUE_TIMEOUT", "2.0"))
+MAX_MEETINGS = int(os.getenv("MC_SERVER_MAX_MEETINGS", "1024"))
+MAX_BODY_BYTES = 64 * 1024
+
+
+class Meeting:
+    # Az appot (és vele a checkpointerét) a meeting a létrehozáskor rögzíti:
+    # az app cache-ből kiesett app így nem viszi el a meeting threadjét, és a
+    # meeting élettartama alatt nem fordul újra.
+    def __init__(self, brief: str, schedule: str):
+        self.id = uuid4().hex
+        self.brief = brief
+        self.schedule = schedule
+        self.lock = threading.Lock()
+        self.app = get_app(brief, schedule)
+
+    @property
+    def config(self):
+        return {"configurable": {"thread_id": f"server-{self.id}", "priority": "interactive"}}
+
+
+class MeetingService:
+    def __init__(self, *, max_streams: int = MAX_STREAMS, queue_timeout: float = QUEUE_TIMEOUT):
+        # lejárt/kiesett meeting -> 404, az app cache-t nem érinti
+        self.meetings = LRUCache(maxsize=MAX_MEETINGS, ttl=24 * 3600)
+        self.max_streams = max_streams
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_streams)
+        self._stats_lock = threading.Lock()
+        self.active = 0
+        self.rejected = 0
+
+    def create(self, brief: str, schedule: str | None = None) -> Meeting:
+        # ismeretlen schedule -> ValueError (400)
+        meeting = Meeting(brief, get_routing(schedule).name)
+        self.meetings.put(meeting.id, meeting)
+        return meeting
+
+    def get(self, meeting_id: str):
+        return self.meetings.get(meeting_id)
+
+    def acquire_slot(self) -> bool:
+        if self._slots.acquire(timeout=self.queue_timeout):
+            with self._stats_lock:
+                self.active += 1
+            return True
+        with self._stats_lock:
+            self.rejected += 1
+        return False
+
+    def release_slot(self):
+        with self._stats_lock:
+            self.active -= 1
+        self._slots.release()
+
+    def events(self, meeting: Meeting, message: str):
+        app = meeting.app
+        initial = {
+            "messages": [{"role": "user", "content": message}],
+            "turn": 0,
+            "stop_reason": "",
+            "turns_saved": 0,
+        }
+        for event in stream_turns(app, initial, meeting.config):
+            if event["type"] == "token":
+                yield "token", {"node": event["node"], "text": event["text"]}
+                continue
+            yield "message", {
+                "node": event["node"],
+                "speaker": NODE_NAMES.get(event["node"], event["node"]),
+                "text": message_text(event["message"]),
+                "ttft": event["ttft"],
+                "elapsed": event["elapsed"],
+                "metrics": event["metrics"],
+            }
+        state = app.get_state(meeting.config).values
+        yield "done", {
+            "stop_reason": state.get("stop_reason", ""),
+            "turns_saved": state.get("turns_saved", 0),
+        }
+
+    def transcript(self, meeting: Meeting):
+        state = meeting.app.get_state(meeting.config).values
+        return {
+            "meeting_id": meeting.id,
+            "brief_hash": brief_hash(meeting.brief),
+            "schedule": meeting.schedule,
+            "messages": [
+                {"role": m.type, "name": getattr(m, "name", None), "text": message_text(m)}
+                for m in state.get("messages", [])
+            ],
+            "stop_reason": state.get("stop_reason", ""),
+            "metrics": state_summary(state.get("metrics")),
+        }
+
+    def stats(self):
+        with self._stats_lock:
+            streams = {"active": self.active, "max": self.max_streams, "rejected": self.rejected}
+        return {
+            "streams": streams,
+            "meetings": len(self.meetings),
+            "app_cache": app_cache_stats(),
+            "brief_specs": brief_spec_stats(),
+            "scheduler": scheduler_stats(),
+        }
+
+
+class MeetingHandler(BaseHTTPRequestHandler):
+    service: MeetingService = None  # make_server állítja be
+
+    def log_message(self, format, *args):  # noqa: A002 - BaseHTTPRequestHandler API
+        sys.stderr.write(f"[meetingServer] {self.address_string()} {format % args}\n")
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            raise ValueError("request body too large")
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError as err:
+            raise ValueError(f"invalid JSON: {err}") from err
+        if not isinstance(payload, dict):
+            raise ValueError("expected a JSON object")
+        return payload
+
+    def _path_parts(self):
+        return [p for p in self.path.split("?", 1)[0].split("/") if p]
+
+    def do_GET(self):
+        parts = self._path_parts()
+        if parts == ["health"]:
+            return self._send_json(HTTPStatus.OK, self.service.stats())
+        if len(parts) == 2 and parts[0] == "meetings":
+            meeting = self.service.get(parts[1])
+            if meeting is None:
+                return self._send_json(HTTPStatus.NOT_FOUND, {"error": "unknown meeting"})
+            return self._send_json(HTTPStatus.OK, self.service.transcript(meeting))
+        self._send_json(HTTPStatus.NOT_FOUND, {"error": "not found"})
+
+    def do_POST(self):
+        parts = self._path_parts()
+        try:
+            payload = self._read_json()
+        except ValueError as err:
+            return self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(err)})
+
+        if parts == ["meetings"]:
+            brief = payload.get("brief")
+            if not isinstance(brief, str) or not brief.strip():
+                return self._send_json(HTTPStatus.BAD_REQUEST, {"error": "missing 'brief'"})
+            try:
+                meeting = self.service.create(brief, payload.get("schedule"))
+            except ValueError as err:
+                return self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(err)})
+            return self._send_json(
+                HTTPStatus.CREATED,
+                {
+                    "meeting_id": meeting.id,
+                    "brief_hash": brief_hash(brief),
+                    "schedule": meeting.schedule,
+                },
+            )
+
+        if len(parts) == 3 and parts[0] == "meetings" and parts[2] == "messages":
+            return self._post_message(parts[1], payload)
+        self._send_json(HTTPStatus.NOT_FOUND, {"error": "not found"})
+
+    def _post_message(self, meeting_id, payload):
+        meeting = self.service.get(meeting_id)
+        if meeting is None:
+            return self._send_json(HTTPStatus.NOT_FOUND, {"error": "unknown meeting"})
+        message = payload.get("message")
+        if not isinstance(message, str) or not message.strip():
+            return self._send_json(HTTPStatus.BAD_REQUEST, {"error": "missing 'message'"})
+
+        if not meeting.lock.acquire(blocking=False):
+            return self._send_json(
+                HTTPStatus.CONFLICT, {"error": "a message is already running for this meeting"}
+            )
+        try:
+            if not self.service.acquire_slot():
+                return self._send_json(
+                    HTTPStatus.SERVICE_UNAVAILABLE,
+                    {"error": "server busy, retry later"},
+                    headers={"Retry-After": "1"},
+                )
+            try:
+                self._stream(meeting, message)
+            finally:
+                self.service.release_slot()
+        finally:
+            meeting.lock.release()
+
+    def _stream(self, meeting, message):
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        events = self.service.events(meeting, message)
+        try:
+            for name, data in events:
+                self._send_event(name, data)
+        except (BrokenPipeError, ConnectionResetError):
+            # a kliens lezárta a kapcsolatot: a graph streamet is leállítjuk
+            self.log_message("client disconnected from meeting %s", meeting.id)
+        except Exception as err:  # noqa: BLE001 - a hiba a kliensnek menjen, ne csak a logba
+            self.log_error("meeting %s failed: %r", meeting.id, err)
+            try:
+                self._send_event("error", {"error": repr(err)})
+            except OSError:
+                pass
+        finally:
+            events.close()
+        self.close_connection = True
+
+    def _send_event(self, name, data):
+        body = json.dumps(data, ensure_ascii=False, default=str)
+        self.wfile.write(f"event: {name}\ndata: {body}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+
+def make_server(host: str = "127.0.0.1", port: int = 8000, *, service: MeetingService | None = None):
+    handler = type("BoundMeetingHandler", (MeetingHandler,), {"service": service or MeetingService()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve discovery meetings over HTTP/SSE.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-streams", type=int, default=MAX_STREAMS)
+    parser.add_argument("--queue-timeout", type=float, default=QUEUE_TIMEOUT)
+    args = parser.parse_args(argv)
+
+    service = MeetingService(max_streams=args.max_streams, queue_timeout=args.queue_timeout)
+    server = make_server(args.host, args.port, service=service)
+    print(f"✅ meeting server on http://{args.host}:{args.port} (max {args.max_streams} streams)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
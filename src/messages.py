@@ -0,0 +1,74 @@
+import sys
+
+# Compact message form for graph state and checkpoints. The agents return
+# provider messages (Responses API part lists with annotations, response and
+# usage metadata, tool call scaffolding); the state only needs the speaker and
+# the plain text, and every stored byte is re-serialized on each checkpoint.
+# Usage is taken from the raw message for telemetry before it is compacted.
+# langchain_core is imported inside the functions: the cli only needs the
+# text helpers and should not pay for it at startup.
+
+
+def content_to_text(content):
+    # string
+    if isinstance(content, str):
+        return content
+    # Responses API: list of parts
+    if isinstance(content, list):
+        return "\n".join(
+            p.get("text", "")
+            for p in content
+            if isinstance(p, dict) and p.get("type") == "text"
+        ).strip()
+    return str(content)
+
+
+def message_text(m) -> str:
+    # LangChain message or {"role", "content"} dict
+    if isinstance(m, dict):
+        return content_to_text(m.get("content", ""))
+    return content_to_text(m.content)
+
+
+def chunk_to_text(content):
+    # streamed token chunk: no strip, the whitespace between tokens matters
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            p.get("text", "")
+            for p in content
+            if isinstance(p, dict) and p.get("type") == "text"
+        )
+    return ""
+
+
+def speaker_name(name):
+    # a beszélő nevek minden üzenetben ugyanazok: egy példány a memóriában
+    return sys.intern(name) if isinstance(name, str) else name
+
+
+def compact_message(content, name=None, id=None):  # noqa: A002 - a message mező neve
+    from langchain_core.messages import AIMessage
+
+    return AIMessage(content=content_to_text(content), name=speaker_name(name), id=id)
+
+
+def compact_ai_messages(messages):
+    # a node által visszaadott agent üzenetek közül csak a szöveges AI
+    # válaszokat tartja meg (tool hívások / üres részek nélkül), metadata nélkül
+    from langchain_core.messages import AIMessage
+
+    return [
+        compact_message(m.content, getattr(m, "name", None), getattr(m, "id", None))
+        for m in messages
+        if isinstance(m, AIMessage) and not m.tool_calls and content_to_text(m.content)
+    ]
+
+
+def new_messages(before, after):
+    # create_agent a bemeneti history-t is visszaadja; csak az új üzenetek
+    # kerüljenek a state-be (id alapján, a bemenet üzenetei már id-t kaptak)
+    seen = {getattr(m, "id", None) for m in before}
+    seen.discard(None)
+    return [m for m in after if getattr(m, "id", None) not in seen]
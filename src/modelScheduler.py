@@ -0,0 +1,191 @@
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+
+# Process-wide admission control for model calls. Every role node asks for a
+# slot before calling its model, so UI sessions, server meetings and batch
+# jobs sharing one API key share one budget:
+#   - at most max_concurrent calls in flight,
+#   - at most tokens_per_minute (estimated at admission, corrected with the
+#     real usage afterwards) over a sliding 60s window (0 = no limit),
+#   - priority classes: "interactive" is always served before "batch",
+#   - within a class, meetings are served round-robin (one call per meeting
+#     per pass), so a busy meeting cannot starve the others.
+# stats() reports queue depth per class, wait times and the budget in use.
+
+PRIORITIES = ("interactive", "batch")
+WINDOW_SECONDS = 60.0
+
+
+class Ticket:
+    def __init__(self, meeting: str, priority: str, estimate: int):
+        self.meeting = meeting
+        self.priority = priority
+        self.estimate = estimate
+        self.enqueued = time.monotonic()
+        self.wait = 0.0
+        self.admitted = threading.Event()
+        self._charge = None  # a ticket bejegyzése a TPM ablakban
+
+    def report(self, tokens: int):
+        # a hívás tényleges token száma (input + output), ha ismert
+        if self._charge is not None and tokens:
+            self._charge[2] = tokens
+
+
+class ModelScheduler:
+    def __init__(self, max_concurrent: int = 16, tokens_per_minute: int = 0):
+        self.max_concurrent = max_concurrent
+        self.tokens_per_minute = tokens_per_minute
+        self._lock = threading.Lock()
+        # priority -> meeting -> várakozó ticketek; az OrderedDict sorrendje a round-robin
+        self._queues = {p: OrderedDict() for p in PRIORITIES}
+        self._running = 0
+        self._window = deque()  # [admitted_at, estimate, actual]
+        self._waits = {p: {"count": 0, "total_s": 0.0, "max_s": 0.0} for p in PRIORITIES}
+
+    def _window_tokens(self, now):
+        while self._window and now - self._window[0][0] > WINDOW_SECONDS:
+            self._window.popleft()
+        return sum(entry[2] for entry in self._window)
+
+    def _budget_allows(self, ticket, now) -> bool:
+        if self.tokens_per_minute <= 0:
+            return True
+        used = self._window_tokens(now)
+        # egy budgetnél nagyobb hívás is átmegy, ha az ablak üres
+        return used + ticket.estimate <= self.tokens_per_minute or not self._window
+
+    def _dispatch(self):
+        # lock alatt hívandó: amíg van szabad hely, a legmagasabb prioritású
+        # osztály soron következő meetingjének első ticketjét engedi be
+        now = time.monotonic()
+        while self._running < self.max_concurrent:
+            queue = next((self._queues[p] for p in PRIORITIES if self._queues[p]), None)
+            if queue is None:
+                return
+            meeting, waiters = next(iter(queue.items()))
+            ticket = waiters[0]
+            if not self._budget_allows(ticket, now):
+                return
+            waiters.popleft()
+            del queue[meeting]
+            if waiters:
+                queue[meeting] = waiters  # a sor végére: a többi meeting jön előbb
+            self._running += 1
+            ticket._charge = [now, ticket.estimate, ticket.estimate]
+            self._window.append(ticket._charge)
+            ticket.wait = now - ticket.enqueued
+            waits = self._waits[ticket.priority]
+            waits["count"] += 1
+            waits["total_s"] += ticket.wait
+            waits["max_s"] = max(waits["max_s"], ticket.wait)
+            ticket.admitted.set()
+
+    def _enqueue(self, meeting: str, priority: str, estimate: int) -> Ticket:
+        if priority not in self._queues:
+            raise ValueError(f"unknown priority {priority!r}; known: {PRIORITIES}")
+        ticket = Ticket(meeting, priority, estimate)
+        with self._lock:
+            self._queues[priority].setdefault(meeting, deque()).append(ticket)
+            self._dispatch()
+        return ticket
+
+    def _poll(self, ticket: Ticket):
+        # a TPM ablak idővel szabadul fel, ezért a várakozók időnként újrapróbálják
+        with self._lock:
+            self._dispatch()
+        return ticket.admitted.is_set()
+
+    def _release(self, ticket: Ticket):
+        with self._lock:
+            self._running -= 1
+            self._dispatch()
+
+    def _abandon(self, ticket: Ticket):
+        # a várakozást megszakították (cancel, KeyboardInterrupt, ...): a még
+        # sorban álló ticket kikerül a sorból, a közben beengedett elengedi a helyét
+        with self._lock:
+            if ticket.admitted.is_set():
+                self._running -= 1
+            else:
+                queue = self._queues[ticket.priority]
+                waiters = queue.get(ticket.meeting)
+                if waiters is not None and ticket in waiters:
+                    waiters.remove(ticket)
+                    if not waiters:
+                        del queue[ticket.meeting]
+            self._dispatch()
+
+    @contextmanager
+    def slot(self, meeting: str, priority: str = "interactive", estimate: int = 0):
+        ticket = self._enqueue(meeting, priority, estimate)
+        try:
+            while not ticket.admitted.wait(0.25):
+                self._poll(ticket)
+        except BaseException:
+            self._abandon(ticket)
+            raise
+        try:
+            yield ticket
+        finally:
+            self._release(ticket)
+
+    @asynccontextmanager
+    async def aslot(self, meeting: str, priority: str = "interactive", estimate: int = 0):
+        ticket = self._enqueue(meeting, priority, estimate)
+        try:
+            while not ticket.admitted.is_set():
+                await asyncio.sleep(0.05)
+                self._poll(ticket)
+        except BaseException:
+            self._abandon(ticket)
+            raise
+        try:
+            yield ticket
+        finally:
+            self._release(ticket)
+
+    def stats(self):
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "running": self._running,
+                "max_concurrent": self.max_concurrent,
+                "queued": {
+                    p: sum(len(w) for w in self._queues[p].values()) for p in PRIORITIES
+                },
+                "waiting_meetings": {p: len(self._queues[p]) for p in PRIORITIES},
+                "wait_s": {
+                    p: {
+                        "count": w["count"],
+                        "avg": w["total_s"] / w["count"] if w["count"] else 0.0,
+                        "max": w["max_s"],
+                    }
+                    for p, w in self._waits.items()
+                },
+                "tokens_last_minute": self._window_tokens(now),
+                "tokens_per_minute": self.tokens_per_minute,
+            }
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> ModelScheduler:
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = ModelScheduler(
+                max_concurrent=int(os.getenv("MC_SCHED_MAX_CONCURRENT", "16")),
+                tokens_per_minute=int(os.getenv("MC_SCHED_TOKENS_PER_MINUTE", "0")),
+            )
+        return _scheduler
+
+
+def scheduler_stats():
+    return get_scheduler().stats()
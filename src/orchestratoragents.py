@@ -1,5 +1,13 @@
-from langchain_openai import ChatOpenAI
-from langchain.agents import create_agent
+import threading
+from typing import Literal, get_args
+
+# Lazy, mint az src/agents.py: a role selector csak akkor épül fel, amikor a
+# lokális osztályozó bizonytalan és tényleg LLM-et kell hívni.
+
+Role = Literal["frontenddeveloper", "businessanalyst"]
+
+# {"role": "businessanalyst"} ~8 token; 16 a Responses API minimuma
+ROLE_SELECTOR_MAX_TOKENS = 16
 
 
 SYSTEM_PROMPT_ROLE_SELECTOR = """
@@ -13,13 +21,84 @@ Return the role in the following format:
 {role}
 """
 
-roleSelector = ChatOpenAI(
-    model="gpt-4.1-mini",
-    temperature=0,
-    use_responses_api=True,
-)
+# a strukturált selectorhoz: a formátumot a séma adja, nem a prompt
+SYSTEM_PROMPT_ROLE_CHOICE = """
+Pick the role that should answer the user's last message:
+frontenddeveloper (code, UI, implementation) or businessanalyst
+(requirements, scope, process, cost).
+"""
+
+_lock = threading.Lock()
+_registry = {}
+
+
+def get_role_selector():
+    with _lock:
+        if "roleSelector" not in _registry:
+            from src.llmClients import make_chat_model
+
+            _registry["roleSelector"] = make_chat_model(
+                "gpt-4.1-mini",
+                temperature=0,
+                use_responses_api=True,
+            )
+        return _registry["roleSelector"]
+
+
+def get_role_selector_agent():
+    model = get_role_selector()
+    with _lock:
+        if "roleSelectorAgent" not in _registry:
+            from langchain.agents import create_agent
+
+            _registry["roleSelectorAgent"] = create_agent(
+                model=model,
+                system_prompt=SYSTEM_PROMPT_ROLE_SELECTOR,
+                checkpointer=False,
+            )
+        return _registry["roleSelectorAgent"]
+
+
+def get_structured_role_selector():
+    with _lock:
+        if "structuredRoleSelector" not in _registry:
+            from pydantic import BaseModel, Field
+
+            from src.llmClients import make_chat_model
+
+            class RoleChoice(BaseModel):
+                role: Role = Field(description="The role that should answer.")
+
+            model = make_chat_model(
+                "gpt-4.1-mini",
+                temperature=0,
+                max_tokens=ROLE_SELECTOR_MAX_TOKENS,
+                use_responses_api=True,
+            )
+            # include_raw: a séma-hiba nem kivétel, hanem {"parsed": None, "raw": ...}
+            _registry["structuredRoleSelector"] = model.with_structured_output(
+                RoleChoice, include_raw=True
+            )
+        return _registry["structuredRoleSelector"]
+
+
+def choose_role(messages) -> str:
+    # Egy hívás, újrapróbálás nélkül: sikeres parse esetén a séma garantálja,
+    # hogy a válasz egy Role érték; különben a nyers szöveget adjuk vissza, amit
+    # a roleRouter.parse_role / kulcsszavas fallback kezel.
+    result = get_structured_role_selector().invoke(
+        [{"role": "system", "content": SYSTEM_PROMPT_ROLE_CHOICE}, *messages]
+    )
+    parsed = result.get("parsed")
+    if parsed is not None and parsed.role in get_args(Role):
+        return parsed.role
+    raw = result.get("raw")
+    return getattr(raw, "content", "") if raw is not None else ""
+
 
-roleSelectorAgent = create_agent(
-    model=roleSelector,
-    system_prompt=SYSTEM_PROMPT_ROLE_SELECTOR,
-)
+def __getattr__(name: str):
+    if name == "roleSelector":
+        return get_role_selector()
+    if name == "roleSelectorAgent":
+        return get_role_selector_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,262 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langgraph.checkpoint.memory import InMemorySaver
+
+_root = Path(__file__).resolve().parent.parent
+if str(_root) not in sys.path:
+    sys.path.insert(0, str(_root))
+
+from src.fakeLLM import FakeChatModel  # noqa: E402
+from src.llmClients import openai_chat_model, set_chat_model_factory  # noqa: E402
+from src.messages import message_text  # noqa: E402
+
+# Record/playback of model calls, so orchestration changes (routing, prompts,
+# context handling) can be profiled and regression-tested offline:
+#
+#   python src/replay.py record meeting.jsonl          # live run, every call saved
+#   python src/replay.py play meeting.jsonl --speed 0  # same meeting, no network
+#
+# The transcript is JSONL, one line per model call: model, request hash,
+# system prompt hash, streamed chunks, time to first token, total time and
+# usage. Request contents are not stored, only their hashes.
+#
+# Playback answers a request with the recording of the identical request; if
+# the request changed (e.g. a tweaked prompt or context window), it takes the
+# next unused recording of the same role (system prompt), then of the same
+# model, and counts the match kinds so drift is visible. --speed scales the
+# recorded latencies (1 = as recorded, 10 = ten times faster, 0 = instant).
+
+
+def _request_parts(messages):
+    return [(m.type, getattr(m, "name", None), message_text(m)) for m in messages]
+
+
+def request_key(model: str, messages) -> str:
+    payload = json.dumps([model, _request_parts(messages)], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:24]
+
+
+def prompt_key(messages) -> str:
+    # a szerep azonosítója: az első system üzenet (a role system promptja)
+    system = next((message_text(m) for m in messages if m.type == "system"), "")
+    return hashlib.sha256(system.encode("utf-8")).hexdigest()[:12]
+
+
+class Recorder:
+    # Appends one JSONL line per finished model call; thread-safe, so
+    # parallel rounds and concurrent meetings can share one transcript.
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def handler(self, model: str):
+        return _RecordingHandler(self, model)
+
+    def write(self, record):
+        with self._lock:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+            self.calls += 1
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class _RecordingHandler(BaseCallbackHandler):
+    def __init__(self, recorder: Recorder, model: str):
+        self.recorder = recorder
+        self.model = model
+        self._runs = {}  # run_id -> (request key, prompt key, started, first token, chunks)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        batch = messages[0]
+        self._runs[run_id] = {
+            "key": request_key(self.model, batch),
+            "prompt_key": prompt_key(batch),
+            "started": time.perf_counter(),
+            "first_token": None,
+            "chunks": [],
+        }
+
+    def on_llm_new_token(self, token, *, run_id, **kwargs):
+        run = self._runs.get(run_id)
+        if run is None or not token:
+            return
+        if run["first_token"] is None:
+            run["first_token"] = time.perf_counter()
+        run["chunks"].append(token)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        generation = response.generations[0][0]
+        message = getattr(generation, "message", None)
+        text = message_text(message) if message is not None else generation.text
+        elapsed = time.perf_counter() - run["started"]
+        ttft = run["first_token"] - run["started"] if run["first_token"] else elapsed
+        self.recorder.write(
+            {
+                "model": self.model,
+                "key": run["key"],
+                "prompt_key": run["prompt_key"],
+                # nem streamelt hívásnál egy darabban
+                "chunks": run["chunks"] if "".join(run["chunks"]).strip() else [text],
+                "ttft": round(ttft, 4),
+                "elapsed": round(elapsed, 4),
+                "usage": dict(getattr(message, "usage_metadata", None) or {}),
+            }
+        )
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._runs.pop(run_id, None)
+
+
+class Transcript:
+    def __init__(self, records):
+        self._lock = threading.Lock()
+        self._by_key = {}
+        self._by_prompt = {}
+        self._by_model = {}
+        self._used = set()
+        for i, r in enumerate(records):
+            self._by_key.setdefault(r["key"], deque()).append(i)
+            self._by_prompt.setdefault((r["model"], r["prompt_key"]), deque()).append(i)
+            self._by_model.setdefault(r["model"], deque()).append(i)
+        self.records = records
+        self.stats = {"exact": 0, "same_role": 0, "same_model": 0, "missing": 0}
+
+    @classmethod
+    def load(cls, path: str):
+        with open(path, encoding="utf-8") as f:
+            return cls([json.loads(line) for line in f if line.strip()])
+
+    def _take(self, queue):
+        while queue:
+            i = queue.popleft()
+            if i not in self._used:
+                self._used.add(i)
+                return self.records[i]
+        return None
+
+    def match(self, model: str, messages):
+        with self._lock:
+            for kind, queue in (
+                ("exact", self._by_key.get(request_key(model, messages))),
+                ("same_role", self._by_prompt.get((model, prompt_key(messages)))),
+                ("same_model", self._by_model.get(model)),
+            ):
+                record = self._take(queue) if queue else None
+                if record is not None:
+                    self.stats[kind] += 1
+                    return record
+            self.stats["missing"] += 1
+            return None
+
+
+class PlaybackChatModel(FakeChatModel):
+    transcript: Any = None
+    speed: float = 1.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "playback-chat"
+
+    def _plan(self, messages):
+        record = self.transcript.match(self.model_name, messages)
+        if record is None:
+            # nincs több felvétel ehhez a modellhez: determinisztikus fake válasz
+            return super()._plan(messages)
+        tokens = record["chunks"]
+        scale = 1 / self.speed if self.speed > 0 else 0.0
+        per_token = (record["elapsed"] - record["ttft"]) / max(len(tokens) - 1, 1)
+        usage = record["usage"] or self._usage(messages, tokens)
+        return tokens, record["ttft"] * scale, max(per_token, 0.0) * scale, usage
+
+
+def record_to(path: str) -> Recorder:
+    # Minden ezután épített modell a valódi ChatOpenAI, felvevő callbackkel.
+    # A modelleket cache-elő függvények (shared_agent, build_summarizer,
+    # get_app) miatt a build_app előtt kell beállítani.
+    recorder = Recorder(path)
+
+    def factory(model: str, **kwargs):
+        kwargs["callbacks"] = [*(kwargs.get("callbacks") or []), recorder.handler(model)]
+        return openai_chat_model(model, **kwargs)
+
+    set_chat_model_factory(factory)
+    return recorder
+
+
+def play_from(path: str, *, speed: float = 1.0) -> Transcript:
+    transcript = Transcript.load(path)
+
+    def factory(model: str, **_kwargs):
+        return PlaybackChatModel(model_name=model, transcript=transcript, speed=speed)
+
+    set_chat_model_factory(factory)
+    return transcript
+
+
+DEFAULT_MESSAGES = [
+    "Egy egyszerű dropshipping termék landing + checkout flow-t szeretnék. Hogyan kezdjünk neki?",
+    "Oké. Legyen Stripe test. Milyen adatokat kérjünk be checkoutnál?",
+]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record or replay a meeting run.")
+    parser.add_argument("mode", choices=["record", "play"])
+    parser.add_argument("transcript", help="JSONL transcript file")
+    parser.add_argument("--brief-file", help="product brief (default: the demo brief)")
+    parser.add_argument("-m", "--message", action="append", help="user message (repeatable)")
+    parser.add_argument("--schedule", help="schedule from schedules.json")
+    parser.add_argument("--speed", type=float, default=1.0, help="playback speed factor (0 = instant)")
+    args = parser.parse_args(argv)
+
+    # a felvétel valódi hívásokat rögzítsen, ne response cache találatokat
+    os.environ["MC_RESPONSE_CACHE"] = "0"
+    if args.mode == "record":
+        Path(args.transcript).unlink(missing_ok=True)
+        recorder = record_to(args.transcript)
+    else:
+        os.environ.setdefault("OPENAI_API_KEY", "sk-offline-playback")
+        transcript = play_from(args.transcript, speed=args.speed)
+
+    from src.conversationBuilder import PRODUCT_BRIEF, build_app, run_conversation
+
+    brief = Path(args.brief_file).read_text(encoding="utf-8") if args.brief_file else PRODUCT_BRIEF
+    # saját, üres checkpointer és egyedi thread: a felvétel/lejátszás mindig
+    # nulláról indul, akkor is, ha MC_CHECKPOINT_DB egy korábbi futást őriz
+    app = build_app(brief, schedule=args.schedule, checkpointer=InMemorySaver())
+    thread_id = f"replay-{args.mode}-{uuid4().hex[:8]}"
+
+    started = time.perf_counter()
+    for i, message in enumerate(args.message or DEFAULT_MESSAGES):
+        run_conversation(app, message, thread_id, is_new_thread=i == 0)
+    elapsed = time.perf_counter() - started
+
+    if args.mode == "record":
+        recorder.close()
+        print(f"\n⏺ {recorder.calls} model calls recorded to {args.transcript} in {elapsed:.1f}s")
+    else:
+        print(f"\n▶ played back in {elapsed:.2f}s (speed {args.speed}); matches: {transcript.stats}")
+
+
+if __name__ == "__main__":
+    main()
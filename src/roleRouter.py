@@ -0,0 +1,114 @@
+import re
+import threading
+from typing import get_args
+
+from src.messages import message_text
+
+# Local fast path for the role selector: score the last user message against
+# per-role keyword stems and only ask the LLM when the result is ambiguous.
+# Stems are matched as word prefixes, so Hungarian suffixes
+# ("komponenseket", "követelményeit") still hit. Stems of SHORT_STEM
+# characters or fewer ("ui", "form", "roi") would prefix unrelated words
+# ("uid", "formátum"), so they only count as whole words; their inflected
+# forms are left to the LLM.
+
+ROLE_KEYWORDS = {
+    "frontenddeveloper": (
+        "frontend", "front-end", "react", "vue", "angular", "svelte", "next.js",
+        "javascript", "typescript", "html", "css", "tailwind", "props",
+        "hook", "komponens", "component", "gomb", "button", "űrlap", "form",
+        "layout", "reszponzív", "responsive", "animáci", "animation", "stílus",
+        "style", "render", "bundle", "webpack", "vite", "npm", "böngész",
+        "browser", "ui", "kód", "code", "implementál", "implement", "api hív",
+        "fetch", "debug", "hiba", "bug", "teljesítmény", "performance",
+    ),
+    "businessanalyst": (
+        "követelmény", "requirement", "üzleti", "business", "stakeholder",
+        "érintett", "folyamat", "process", "user story", "scope", "hatókör",
+        "mvp", "priorit", "költség", "cost", "budget", "költségvetés",
+        "határidő", "deadline", "elfogadási", "acceptance", "kpi", "metrik",
+        "piac", "market", "ügyfél", "customer", "felhasználói igény",
+        "use case", "specifikáci", "specification", "roadmap", "ütemterv",
+        "bevétel", "revenue", "kockázat", "risk", "megtérül", "roi",
+    ),
+}
+
+# A minimum score lead over the runner-up that counts as a confident answer.
+MIN_MARGIN = 1
+SHORT_STEM = 4
+
+_WORD_RE = re.compile(r"[\w.+-]+", re.UNICODE)
+_WHOLE_WORD = {
+    stem: re.compile(rf"\b{re.escape(stem)}\b")
+    for stems in ROLE_KEYWORDS.values()
+    for stem in stems
+    if len(stem) <= SHORT_STEM
+}
+
+_lock = threading.Lock()
+_stats = {"fast_path": 0, "llm_fallback": 0, "invalid_label": 0}
+
+
+def _count(key: str):
+    with _lock:
+        _stats[key] += 1
+
+
+def router_stats():
+    with _lock:
+        return dict(_stats)
+
+
+def score_roles(text: str):
+    text = text.lower()
+    words = _WORD_RE.findall(text)
+    scores = {}
+    for role, stems in ROLE_KEYWORDS.items():
+        score = 0
+        for stem in stems:
+            if " " in stem:
+                score += stem in text
+            elif stem in _WHOLE_WORD:
+                score += _WHOLE_WORD[stem].search(text) is not None
+            else:
+                score += any(w.startswith(stem) for w in words)
+        scores[role] = score
+    return scores
+
+
+def classify_role(text: str):
+    # (role, margin) if confident, otherwise None
+    scores = score_roles(text)
+    ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+    (best, best_score), (_, second_score) = ranked[0], ranked[1]
+    margin = best_score - second_score
+    if best_score > 0 and margin >= MIN_MARGIN:
+        return best, margin
+    return None
+
+
+def parse_role(label, allowed) -> str | None:
+    # Tolerates "{frontenddeveloper}", whitespace, casing or a short sentence,
+    # but only if exactly one allowed role is mentioned.
+    text = message_text({"content": label}).lower()
+    found = [role for role in allowed if role in text]
+    return found[0] if len(found) == 1 else None
+
+
+def select_role(messages, llm_select, role_type, default):
+    allowed = get_args(role_type)
+    text = message_text(messages[-1]) if messages else ""
+
+    fast = classify_role(text)
+    if fast is not None:
+        _count("fast_path")
+        return fast[0]
+
+    _count("llm_fallback")
+    role = parse_role(llm_select(messages), allowed)
+    if role is None:
+        _count("invalid_label")
+        scores = score_roles(text)
+        best = max(allowed, key=lambda r: scores.get(r, 0))
+        return best if scores.get(best, 0) > 0 else default
+    return role
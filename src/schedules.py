@@ -0,0 +1,127 @@
+import functools
+import json
+import os
+from pathlib import Path
+
+# Meeting schedules from a config file (default: schedules.json in the repo
+# root, MC_SCHEDULES overrides the path). A schedule names the speaking order
+# as a repeating cycle, the turn limit, the per-role model and request timeout
+# (seconds, per attempt) and which adjacent roles may answer in parallel:
+#
+#   {"default": "standard",
+#    "models": {"customer": "gpt-4.1-nano", ...},
+#    "timeouts": {"customer": 20, ...},
+#    "parallel_groups": [["customer", "fe"]],
+#    "schedules": {"standard": {"cycle": ["customer", "fe", "ba", "fe", "ba"],
+#                               "max_turns": 6}}}
+#
+# "models", "timeouts" and "parallel_groups" at the top level are defaults
+# that a schedule can override. Each schedule is compiled once into a
+# RoutingTable.
+
+ROLES = ("customer", "fe", "ba")
+
+_root = Path(__file__).resolve().parent.parent
+DEFAULT_SCHEDULES_PATH = _root / "schedules.json"
+
+
+class RoutingTable:
+    # turn index -> the round (one or more roles) that starts at that turn
+    def __init__(
+        self, name: str, sequence, max_turns: int, models, timeouts, rounds, groups=()
+    ):
+        self.name = name
+        self.sequence = sequence
+        self.max_turns = max_turns
+        self.models = models
+        self.timeouts = timeouts
+        self.rounds = rounds
+        self.groups = frozenset(groups)
+        self.parallel = any(len(r) > 1 for r in rounds.values())
+
+    @property
+    def roles(self):
+        # a schedule-ban ténylegesen szereplő szerepek, első felszólalás szerint
+        return tuple(dict.fromkeys(self.sequence))
+
+    @property
+    def entry(self):
+        return self.sequence[0]
+
+    def round_at(self, turn: int):
+        return self.rounds.get(turn) or self.sequence[turn : turn + 1]
+
+    def independent(self, current: str, nxt: str) -> bool:
+        # a parallel_groups szerint nxt válaszolhat current válasza nélkül
+        return any((current, nxt) in zip(g, g[1:]) for g in self.groups)
+
+    def next_round(self, state):
+        # [] = vége: korai leállás vagy elfogyott a schedule
+        if state.get("stop_reason") or state["turn"] >= self.max_turns:
+            return []
+        return self.round_at(state["turn"])
+
+
+def _validate(name, spec, models):
+    cycle = spec.get("cycle")
+    if not cycle:
+        raise ValueError(f"schedule {name!r}: 'cycle' must list at least one role")
+    unknown = set(cycle) - set(ROLES)
+    if unknown:
+        raise ValueError(f"schedule {name!r}: unknown roles {sorted(unknown)}")
+    missing = set(cycle) - set(models)
+    if missing:
+        raise ValueError(f"schedule {name!r}: no model for roles {sorted(missing)}")
+    if int(spec.get("max_turns", 0)) < 1:
+        raise ValueError(f"schedule {name!r}: 'max_turns' must be at least 1")
+
+
+def compile_schedule(name: str, spec, *, parallel: bool, defaults=None):
+    defaults = defaults or {}
+    models = {**defaults.get("models", {}), **spec.get("models", {})}
+    timeouts = {**defaults.get("timeouts", {}), **spec.get("timeouts", {})}
+    _validate(name, spec, models)
+
+    max_turns = int(spec["max_turns"])
+    cycle = list(spec["cycle"])
+    sequence = (cycle * -(-max_turns // len(cycle)))[:max_turns]
+    groups = {
+        tuple(g) for g in spec.get("parallel_groups", defaults.get("parallel_groups", []))
+    }
+
+    rounds = {}
+    i = 0
+    while i < max_turns:
+        size = next(
+            (len(g) for g in groups if parallel and tuple(sequence[i : i + len(g)]) == g), 1
+        )
+        rounds[i] = sequence[i : i + size]
+        i += size
+    return RoutingTable(name, sequence, max_turns, models, timeouts, rounds, groups)
+
+
+@functools.cache
+def load_schedules(path: str | None = None):
+    path = Path(path or os.getenv("MC_SCHEDULES") or DEFAULT_SCHEDULES_PATH)
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    if config.get("default") not in config.get("schedules", {}):
+        raise ValueError(f"{path}: 'default' must name one of the schedules")
+    return config
+
+
+def schedule_names():
+    return sorted(load_schedules()["schedules"])
+
+
+def default_schedule() -> str:
+    return os.getenv("MC_SCHEDULE") or load_schedules()["default"]
+
+
+@functools.cache
+def get_routing(name: str | None = None, parallel: bool = False) -> RoutingTable:
+    config = load_schedules()
+    name = name or default_schedule()
+    if name not in config["schedules"]:
+        raise ValueError(f"unknown schedule {name!r}; known: {schedule_names()}")
+    return compile_schedule(name, config["schedules"][name], parallel=parallel, defaults=config)
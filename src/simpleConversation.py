@@ -1,8 +1,7 @@
-from langgraph.graph import StateGraph, START, END, MessagesState
 from dotenv import load_dotenv
+import functools
 import sys
 from pathlib import Path
-from typing import Literal
 
 load_dotenv()
 
@@ -10,51 +9,93 @@ _root = Path(__file__).resolve().parent.parent
 if str(_root) not in sys.path:
     sys.path.insert(0, str(_root))
 
-from src.agents import frontendDeveloperAgent  # noqa: E402
-from src.orchestratoragents import roleSelectorAgent  # noqa: E402
-from src.agents import businessAnalystAgent  # noqa: E402
+from src.agents import get_agent  # noqa: E402
+from src.messages import compact_ai_messages, new_messages  # noqa: E402
+from src.orchestratoragents import Role, choose_role  # noqa: E402
+from src.roleRouter import select_role  # noqa: E402
 
+# A graph (és vele a langgraph import) csak első használatkor épül:
+# get_graph() / make_graph(), vagy a régi `graph` és `ChatState` nevek a
+# modul __getattr__-ján keresztül. Az agentek a node-okban, első hívásra
+# jönnek létre.
 
-Role = Literal["frontenddeveloper", "businessanalyst"]
 
+def _agent_reply(agent_name, state):
+    # csak az agent új válasza kerül vissza (a teljes history nem), tömörítve
+    result = get_agent(agent_name).invoke({"messages": state["messages"]})
+    return compact_ai_messages(new_messages(state["messages"], result["messages"]))
 
-class ChatState(MessagesState):
-    last_agent: Role
 
+def frontendDeveloperBot(state):
+    return {
+        "messages": _agent_reply("frontendDeveloperAgent", state),
+        "last_agent": "frontenddeveloper",
+    }
 
-def frontendDeveloperBot(state: ChatState):
-    result = frontendDeveloperAgent.invoke({"messages": state["messages"]})
-    return {"messages": result["messages"], "last_agent": "frontenddeveloper"}
 
+def businessAnalystBot(state):
+    return {
+        "messages": _agent_reply("businessAnalystAgent", state),
+        "last_agent": "businessanalyst",
+    }
 
-def businessAnalystBot(state: ChatState):
-    result = businessAnalystAgent.invoke({"messages": state["messages"]})
-    return {"messages": result["messages"], "last_agent": "businessanalyst"}
 
+def roleSelector(state) -> Role:
+    # lokális kulcsszavas pontozás; csak bizonytalan esetben hívjuk az LLM-et
+    return select_role(
+        state["messages"],
+        _llm_select_role,
+        Role,
+        default="frontenddeveloper",
+    )
 
-def roleSelector(
-    state: ChatState,
-) -> Literal["frontenddeveloper", "businessanalyst"]:
-    response = roleSelectorAgent.invoke({"messages": state["messages"]})
-    # return {"role": response["messages"][-1].content[0]["text"]}
-    return response["messages"][-1].content[0]["text"]
 
+def _llm_select_role(messages):
+    # csak az utolsó üzenet kell a döntéshez (kevesebb input token)
+    return choose_role(messages[-1:])
 
-builder = StateGraph(ChatState)
-builder.add_node("frontenddeveloper", frontendDeveloperBot)
-builder.add_node("roleSelector", roleSelector)
-builder.add_node("businessanalyst", businessAnalystBot)
 
-builder.add_conditional_edges(
-    START,
-    roleSelector,
-    {
-        "frontenddeveloper": "frontenddeveloper",
-        "businessanalyst": "businessanalyst",
-    },
-)
-builder.add_edge("frontenddeveloper", END)
-builder.add_edge("businessanalyst", END)
+@functools.cache
+def get_chat_state():
+    from langgraph.graph import MessagesState
 
+    class ChatState(MessagesState):
+        last_agent: Role
 
-graph = builder.compile()
+    return ChatState
+
+
+@functools.cache
+def get_graph():
+    from langgraph.graph import StateGraph, START, END
+
+    builder = StateGraph(get_chat_state())
+    builder.add_node("frontenddeveloper", frontendDeveloperBot)
+    builder.add_node("roleSelector", roleSelector)
+    builder.add_node("businessanalyst", businessAnalystBot)
+
+    builder.add_conditional_edges(
+        START,
+        roleSelector,
+        {
+            "frontenddeveloper": "frontenddeveloper",
+            "businessanalyst": "businessanalyst",
+        },
+    )
+    builder.add_edge("frontenddeveloper", END)
+    builder.add_edge("businessanalyst", END)
+
+    return builder.compile()
+
+
+def make_graph():
+    # LangGraph server entry point (langgraph.json)
+    return get_graph()
+
+
+def __getattr__(name: str):
+    if name == "graph":
+        return get_graph()
+    if name == "ChatState":
+        return get_chat_state()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,83 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.caching import LRUCache
+
+# Speculative prefetch of the next role's turn (opt-in: MC_SPECULATION=1 or
+# build_app(speculative=True)). In a sequential schedule the next speaker is
+# known while the current one is still answering, so the current node starts
+# the next turn's work in the background:
+#   - "generate": the next role's whole reply, but only if the schedule
+#     declares the pair independent (a parallel_groups entry in
+#     schedules.json: the next role may answer without the current reply);
+#   - "fold": otherwise the summary fold the next turn will need (it only
+#     covers messages older than the current reply).
+# The next node takes the speculation and checks it against the state it
+# actually got: anything else than exactly the current speaker's reply on
+# top of the speculated history (or a different fold window) discards it.
+# Hits, misses and the latency saved go into the turn's metrics record.
+
+SPECULATION_WORKERS = int(os.getenv("MC_SPECULATION_WORKERS", "4"))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# (thread_id, node, turn) -> Speculation; a soha át nem vett (pl. korai
+# leállás miatt árva) spekulációk a TTL után kiesnek
+_pending = LRUCache(maxsize=256, ttl=600)
+
+
+def speculation_default() -> bool:
+    return os.getenv("MC_SPECULATION", "").lower() in ("1", "true", "yes")
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=SPECULATION_WORKERS, thread_name_prefix="speculate"
+            )
+        return _executor
+
+
+class Speculation:
+    def __init__(self, kind: str, after: str, base: int, fold, future):
+        self.kind = kind  # "generate" | "fold"
+        self.after = after  # a node, amelyik alatt elindult
+        self.base = base  # len(state["messages"]) induláskor
+        self.fold = fold  # az előre kiszámolt fold ablak (start, upto) vagy None
+        self.future = future
+        self.started = time.perf_counter()
+        self.finished = None
+        future.add_done_callback(self._done)
+
+    def _done(self, _future):
+        self.finished = time.perf_counter()
+
+    def saved(self, requested_at: float) -> float:
+        # a háttérben már lefutott munka ideje, amit a node nem vár végig
+        end = self.finished if self.finished is not None else requested_at
+        return max(min(end, requested_at) - self.started, 0.0)
+
+    def discard(self):
+        self.future.cancel()
+
+
+def speculate(key, kind: str, after: str, base: int, fold, job):
+    spec = Speculation(kind, after, base, fold, _get_executor().submit(job))
+    _pending.put(key, spec)
+    return spec
+
+
+def take(key):
+    return _pending.pop(key)
+
+
+def discard(key):
+    spec = _pending.pop(key)
+    if spec is not None:
+        spec.discard()
+    return spec
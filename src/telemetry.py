@@ -0,0 +1,371 @@
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+# Per-turn metrics for the meeting nodes: wall time, time to first token,
+# token usage (from the response usage metadata) and estimated cost. Records
+# are emitted to the configured sinks and streamed with the node's update;
+# the graph state only keeps their per-role totals (add_metrics), so the
+# checkpoint does not grow with the meeting.
+
+logger = logging.getLogger("meeting.metrics")
+
+# USD per 1M tokens: (input, cached input, output)
+MODEL_PRICES = {
+    "gpt-4.1-nano": (0.10, 0.025, 0.40),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+}
+
+
+class TurnTimer(BaseCallbackHandler):
+    # wall time of one node run (from started) and time to first token,
+    # counted from the start of its first model call: scheduler queueing and
+    # summary folds are in wall_s, not in the TTFT
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.call_started = None
+        self.first_token_at = None
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        if self.call_started is None:
+            self.call_started = time.perf_counter()
+
+    def on_llm_start(self, serialized, prompts, **kwargs):
+        if self.call_started is None:
+            self.call_started = time.perf_counter()
+
+    def on_llm_new_token(self, token, **kwargs):
+        if self.first_token_at is None and token:
+            self.first_token_at = time.perf_counter()
+
+    @property
+    def ttft(self):
+        if self.first_token_at is None:
+            return None
+        return self.first_token_at - (self.call_started or self.started)
+
+
+def usage_of(message):
+    usage = getattr(message, "usage_metadata", None) or {}
+    details = usage.get("input_token_details") or {}
+    return {
+        "input_tokens": usage.get("input_tokens", 0),
+        "output_tokens": usage.get("output_tokens", 0),
+        "cached_tokens": details.get("cache_read", 0) or 0,
+    }
+
+
+def estimate_cost(model: str, usage) -> float:
+    prices = MODEL_PRICES.get(model)
+    if prices is None:
+        return 0.0
+    input_price, cached_price, output_price = prices
+    uncached = max(usage["input_tokens"] - usage["cached_tokens"], 0)
+    return (
+        uncached * input_price
+        + usage["cached_tokens"] * cached_price
+        + usage["output_tokens"] * output_price
+    ) / 1_000_000
+
+
+def turn_record(
+    node,
+    model,
+    turn,
+    wall,
+    ttft,
+    message=None,
+    *,
+    cache_hit=False,
+    fallback=False,
+    queue_wait=0.0,
+    speculation=None,
+    spec_saved=0.0,
+):
+    usage = usage_of(message) if message is not None else usage_of(None)
+    return {
+        "node": node,
+        "model": model,
+        "turn": turn,
+        "wall_s": round(wall, 4),
+        "ttft_s": round(ttft, 4) if ttft is not None else None,
+        **usage,
+        "cost_usd": estimate_cost(model, usage),
+        "cache_hit": cache_hit,
+        "fallback": fallback,
+        # a modelScheduler sorában töltött idő (a wall_s része)
+        "queue_wait_s": round(queue_wait, 4),
+        # spekulatív előre dolgozás: "hit" / "miss" / None, és a megspórolt idő
+        "speculation": speculation,
+        "spec_saved_s": round(spec_saved, 4),
+        "ts": time.time(),
+    }
+
+
+def accumulate(totals, records):
+    # role -> running sums (plus "total"), extended with the records; the
+    # input is not modified
+    summary = {role: dict(s) for role, s in (totals or {}).items()}
+    for r in records:
+        for key in (r["node"], "total"):
+            s = summary.setdefault(
+                key,
+                {
+                    "turns": 0,
+                    "wall_s": 0.0,
+                    "ttft_sum": 0.0,
+                    "ttft_n": 0,
+                    "input_tokens": 0,
+                    "cached_tokens": 0,
+                    "output_tokens": 0,
+                    "cost_usd": 0.0,
+                    "fallbacks": 0,
+                    "queue_wait_s": 0.0,
+                    "spec_hits": 0,
+                    "spec_misses": 0,
+                    "spec_saved_s": 0.0,
+                },
+            )
+            s["turns"] += 1
+            s["wall_s"] += r["wall_s"]
+            if r["ttft_s"] is not None:
+                s["ttft_sum"] += r["ttft_s"]
+                s["ttft_n"] += 1
+            s["input_tokens"] += r["input_tokens"]
+            s["cached_tokens"] += r.get("cached_tokens", 0)
+            s["output_tokens"] += r["output_tokens"]
+            s["cost_usd"] += r["cost_usd"]
+            s["fallbacks"] += bool(r.get("fallback"))
+            s["queue_wait_s"] += r.get("queue_wait_s", 0.0)
+            s["spec_hits"] += r.get("speculation") == "hit"
+            s["spec_misses"] += r.get("speculation") == "miss"
+            s["spec_saved_s"] += r.get("spec_saved_s", 0.0)
+    return summary
+
+
+def add_metrics(totals, records):
+    # State reducer: the node's turn records are folded into the totals.
+    # Checkpoints written before this kept the record list itself.
+    if isinstance(totals, list):
+        totals = accumulate({}, totals)
+    return accumulate(totals, records)
+
+
+def finish_summary(totals):
+    # running sums -> role -> aggregated totals (avg TTFT instead of the sums)
+    summary = {}
+    for role, s in totals.items():
+        s = dict(s)
+        s["avg_ttft_s"] = s["ttft_sum"] / s["ttft_n"] if s["ttft_n"] else None
+        del s["ttft_sum"], s["ttft_n"]
+        summary[role] = s
+    return summary
+
+
+def summarize(records):
+    # role -> aggregated totals, plus "total"
+    return finish_summary(accumulate({}, records))
+
+
+def state_summary(metrics):
+    # summarize() for the graph state's "metrics" (totals, or a record list
+    # in older checkpoints)
+    if isinstance(metrics, list):
+        return summarize(metrics)
+    return finish_summary(metrics or {})
+
+
+def cache_ratio(s) -> float:
+    # a prompt prefix cache találati aránya (cached / összes input token)
+    return s["cached_tokens"] / s["input_tokens"] if s["input_tokens"] else 0.0
+
+
+def spec_hit_rate(s):
+    # a node által átvett spekulációk közül hány volt használható (None = nem volt)
+    tried = s["spec_hits"] + s["spec_misses"]
+    return s["spec_hits"] / tried if tried else None
+
+
+def format_summary(summary) -> str:
+    lines = []
+    for role, s in sorted(summary.items(), key=lambda kv: kv[0] == "total"):
+        ttft = f"{s['avg_ttft_s']:.2f}s" if s["avg_ttft_s"] is not None else "n/a"
+        fallbacks = f", {s['fallbacks']} fallbacks" if s["fallbacks"] else ""
+        queued = f", {s['queue_wait_s']:.2f}s queued" if s["queue_wait_s"] >= 0.01 else ""
+        rate = spec_hit_rate(s)
+        spec = (
+            f", speculation {rate:.0%} hit ({s['spec_saved_s']:.2f}s saved)"
+            if rate is not None
+            else ""
+        )
+        lines.append(
+            f"{role:>10}: {s['turns']} turns, {s['wall_s']:.2f}s, avg TTFT {ttft}, "
+            f"{s['input_tokens']}→{s['output_tokens']} tokens "
+            f"({cache_ratio(s):.0%} input cached), ${s['cost_usd']:.5f}{fallbacks}{queued}{spec}"
+        )
+    return "\n".join(lines)
+
+
+# --------- sinks ---------
+def _log_to_stderr():
+    # A belépési pontok nem konfigurálnak loggingot, a last-resort handler
+    # pedig csak WARNING-tól ír: a log alapú sinkek saját stderr handlert és
+    # INFO szintet adnak a "meeting.metrics" loggernek (ha még nincs
+    # handlere), és nem propagál, így egy root handler mellett sem duplikál.
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.propagate = False
+    if logger.level == logging.NOTSET or logger.level > logging.INFO:
+        logger.setLevel(logging.INFO)
+
+
+class LogSink:
+    def __init__(self):
+        _log_to_stderr()
+
+    def emit(self, record):
+        logger.info(json.dumps(record, ensure_ascii=False))
+
+
+class PrometheusTextSink:
+    # Aggregated counters rewritten to a text file for the node_exporter
+    # textfile collector.
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._totals = {}
+
+    def emit(self, record):
+        with self._lock:
+            t = self._totals.setdefault(
+                (record["node"], record["model"]),
+                {
+                    "turns": 0,
+                    "wall": 0.0,
+                    "input": 0,
+                    "output": 0,
+                    "cost": 0.0,
+                    "fallbacks": 0,
+                    "queue_wait": 0.0,
+                    "spec_hits": 0,
+                    "spec_misses": 0,
+                    "spec_saved": 0.0,
+                },
+            )
+            t["turns"] += 1
+            t["wall"] += record["wall_s"]
+            t["input"] += record["input_tokens"]
+            t["output"] += record["output_tokens"]
+            t["cost"] += record["cost_usd"]
+            t["fallbacks"] += bool(record.get("fallback"))
+            t["queue_wait"] += record.get("queue_wait_s", 0.0)
+            t["spec_hits"] += record.get("speculation") == "hit"
+            t["spec_misses"] += record.get("speculation") == "miss"
+            t["spec_saved"] += record.get("spec_saved_s", 0.0)
+            self._write()
+
+    def _write(self):
+        metrics = (
+            ("meeting_turns_total", "turns"),
+            ("meeting_turn_seconds_total", "wall"),
+            ("meeting_input_tokens_total", "input"),
+            ("meeting_output_tokens_total", "output"),
+            ("meeting_cost_usd_total", "cost"),
+            ("meeting_fallbacks_total", "fallbacks"),
+            ("meeting_queue_wait_seconds_total", "queue_wait"),
+            ("meeting_speculation_hits_total", "spec_hits"),
+            ("meeting_speculation_misses_total", "spec_misses"),
+            ("meeting_speculation_saved_seconds_total", "spec_saved"),
+        )
+        lines = []
+        for name, key in metrics:
+            lines.append(f"# TYPE {name} counter")
+            for (role, model), t in sorted(self._totals.items()):
+                lines.append(f'{name}{{role="{role}",model="{model}"}} {t[key]}')
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        os.replace(tmp, tmp.with_name(self.path.name))
+
+
+class SpanSink:
+    # OpenTelemetry span per turn if the SDK is installed, otherwise the
+    # same span shape as a JSON log line.
+    def __init__(self):
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            self._tracer = None
+            _log_to_stderr()
+        else:
+            self._tracer = trace.get_tracer("meeting-coordinator")
+
+    def emit(self, record):
+        end_ns = int(record["ts"] * 1e9)
+        start_ns = end_ns - int(record["wall_s"] * 1e9)
+        attributes = {
+            f"meeting.{k}": v
+            for k, v in record.items()
+            if k not in ("ts",) and v is not None
+        }
+        if self._tracer is None:
+            logger.info(
+                json.dumps(
+                    {
+                        "span": f"turn {record['node']}",
+                        "start_ns": start_ns,
+                        "end_ns": end_ns,
+                        "attributes": attributes,
+                    },
+                    ensure_ascii=False,
+                )
+            )
+            return
+        span = self._tracer.start_span(
+            f"turn {record['node']}", start_time=start_ns, attributes=attributes
+        )
+        span.end(end_time=end_ns)
+
+
+_sinks = []
+_sinks_lock = threading.Lock()
+
+
+def add_sink(sink):
+    with _sinks_lock:
+        _sinks.append(sink)
+
+
+def configure_sinks_from_env():
+    # MC_METRICS_SINKS=log,prometheus:/tmp/meeting.prom,otel
+    spec = os.getenv("MC_METRICS_SINKS", "")
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        kind, _, arg = item.partition(":")
+        if kind == "log":
+            add_sink(LogSink())
+        elif kind == "prometheus":
+            add_sink(PrometheusTextSink(arg or "meeting_metrics.prom"))
+        elif kind == "otel":
+            add_sink(SpanSink())
+        else:
+            raise ValueError(f"Unknown metrics sink: {kind!r}")
+
+
+def emit(record):
+    with _sinks_lock:
+        sinks = list(_sinks)
+    for sink in sinks:
+        try:
+            sink.emit(record)
+        except Exception:  # noqa: BLE001 - a metrika sose törje el a meetinget
+            logger.exception("metrics sink %r failed", sink)
+
+
+configure_sinks_from_env()
@@ -1,19 +1,20 @@
+import os
+
 import streamlit as st
 from uuid import uuid4
-import hashlib
-
-from langchain_core.messages import AIMessage
-
-from conversationBuilder import build_app, content_to_text
-
 
-def brief_hash(text: str) -> str:
-    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
-
-
-@st.cache_resource
-def get_cached_app(product_brief: str):
-    return build_app(product_brief)
+from conversationBuilder import (
+    app_cache_stats,
+    brief_hash,
+    format_timing,
+    get_app,
+    message_text,
+    stream_turns,
+)
+from src.caching import LRUCache  # a conversationBuilder import után a gyökér már a path-on van
+from src.modelScheduler import scheduler_stats
+from src.schedules import default_schedule, schedule_names
+from src.telemetry import state_summary
 
 
 SPEAKERS = {
@@ -29,15 +30,74 @@ NODE_TO_SPEAKER = {
     "ba": "BA",
 }
 
+# Rerunonként csak az utolsó HISTORY_PAGE_SIZE üzenet rajzolódik ki; a
+# korábbiak lapozhatók, és csak kérésre renderelődnek. A dedup index a
+# legutóbbi SEEN_IDS_LIMIT kulcsot tartja meg (a checkpointer csak a friss
+# üzeneteket küldi újra).
+HISTORY_PAGE_SIZE = int(os.getenv("MC_UI_PAGE_SIZE", "20"))
+SEEN_IDS_LIMIT = 512
 
-def render_item(item):
-    speaker = item["speaker"]
+
+def bubble_markdown(speaker: str, text: str) -> str:
     meta = SPEAKERS.get(speaker, {"label": speaker, "emoji": "🤖"})
-    role = "user" if speaker == "USER" else "assistant"
+    return f"{meta['emoji']} **{meta['label']}**\n\n{text}"
 
+
+def render_item(item):
+    role = "user" if item["speaker"] == "USER" else "assistant"
+    # egy markdown elem bubble-önként (fejléc + szöveg + timing együtt)
     with st.chat_message(role):
-        st.markdown(f"{meta['emoji']} **{meta['label']}**")
-        st.markdown(item["text"])
+        st.markdown(item["markdown"])
+
+
+def history_item(speaker: str, text: str, timing: str | None = None):
+    markdown = bubble_markdown(speaker, text)
+    if timing:
+        markdown += f"\n\n_⏱ {timing}_"
+    return {"speaker": speaker, "text": text, "timing": timing, "markdown": markdown}
+
+
+def render_history(history, page_size: int):
+    older = len(history) - page_size
+    if older > 0 and st.checkbox(f"Korábbi üzenetek mutatása ({older})"):
+        pages = -(-older // page_size)
+        page = st.number_input("Oldal", min_value=1, max_value=pages, value=pages)
+        start = (page - 1) * page_size
+        for item in history[start : min(start + page_size, older)]:
+            render_item(item)
+        st.divider()
+    for item in history[max(older, 0) :]:
+        render_item(item)
+
+
+def render_metrics(box, state):
+    if not state.get("metrics"):
+        return
+    rows = [
+        {
+            "role": role,
+            "turns": m["turns"],
+            "time (s)": round(m["wall_s"], 2),
+            "avg TTFT (s)": round(m["avg_ttft_s"], 2) if m["avg_ttft_s"] is not None else None,
+            "input tokens": m["input_tokens"],
+            "cached tokens": m["cached_tokens"],
+            "output tokens": m["output_tokens"],
+            "cost ($)": round(m["cost_usd"], 5),
+            "fallbacks": m["fallbacks"],
+            "spec hit/miss": f"{m['spec_hits']}/{m['spec_misses']}",
+            "spec saved (s)": round(m["spec_saved_s"], 2),
+        }
+        for role, m in state_summary(state["metrics"]).items()
+    ]
+    with box.container():
+        st.header("Meeting metrics")
+        st.dataframe(rows, hide_index=True)
+
+
+def render_stop_notice(last_stop):
+    if last_stop:
+        reason, saved = last_stop
+        st.info(f"⏹ A meeting korán leállt ({reason}), {saved} turn megspórolva.")
 
 
 st.set_page_config(page_title="Meeting Coordinator MVP", layout="wide")
@@ -48,11 +108,11 @@ if "thread_id" not in st.session_state:
     st.session_state.thread_id = str(uuid4())
 
 if "history" not in st.session_state:
-    # history: {"speaker": "USER/FE/BA/CUSTOMER", "text": "..."}
+    # history: history_item(...) -> {"speaker", "text", "timing", "markdown"}
     st.session_state.history = []
 
 if "seen_ids" not in st.session_state:
-    st.session_state.seen_ids = set()
+    st.session_state.seen_ids = LRUCache(maxsize=SEEN_IDS_LIMIT)
 
 
 if "last_brief_hash" not in st.session_state:
@@ -72,67 +132,104 @@ Non-goals:
 """
 
 product_brief = st.sidebar.text_area("PRODUCT_BRIEF", value=default_brief, height=260)
+names = schedule_names()
+schedule = st.sidebar.selectbox("Schedule", names, index=names.index(default_schedule()))
 
-# reset history
-current_hash = brief_hash(product_brief)
+# reset history (új brief vagy schedule = új meeting)
+current_hash = f"{brief_hash(product_brief)}:{schedule}"
 if st.session_state.last_brief_hash != current_hash:
     st.session_state.last_brief_hash = current_hash
     st.session_state.thread_id = str(uuid4())
     st.session_state.history = []
-    st.session_state.seen_ids = set()
-
-app = get_cached_app(product_brief)
-
-# --- Render history ---
-for item in st.session_state.history:
-    render_item(item)
+    st.session_state.seen_ids = LRUCache(maxsize=SEEN_IDS_LIMIT)
+    st.session_state.last_stop = None
+
+# a processz-szintű, korlátos app cache (FE/BA agentek közösek)
+app = get_app(product_brief, schedule)
+stats = app_cache_stats()
+st.sidebar.caption(
+    f"App cache: {stats['size']}/{stats['maxsize']} · "
+    f"hit {stats['hits']} · miss {stats['misses']} · evicted {stats['evictions']}"
+)
+sched = scheduler_stats()
+st.sidebar.caption(
+    f"Model calls: {sched['running']}/{sched['max_concurrent']} running · "
+    f"queued {sched['queued']['interactive']} UI / {sched['queued']['batch']} batch · "
+    f"avg wait {sched['wait_s']['interactive']['avg']:.2f}s"
+)
+
+# --- Sidebar: meeting metrics (szerepenként idő, token, költség) ---
+config = {"configurable": {"thread_id": st.session_state.thread_id, "priority": "interactive"}}
+metrics_box = st.sidebar.empty()
+render_metrics(metrics_box, app.get_state(config).values)
+
+# --- Render history (csak az utolsó oldal; a régebbiek kérésre) ---
+render_history(st.session_state.history, HISTORY_PAGE_SIZE)
+stop_box = st.empty()
+with stop_box:
+    render_stop_notice(st.session_state.get("last_stop"))
 
 # --- Chat input ---
 prompt = st.chat_input("Írd ide a user üzenetet…")
 if prompt:
     # 1) user message mentése + megjelenítés
-    st.session_state.history.append({"speaker": "USER", "text": prompt})
-    render_item({"speaker": "USER", "text": prompt})
+    stop_box.empty()
+    user_item = history_item("USER", prompt)
+    st.session_state.history.append(user_item)
+    render_item(user_item)
 
-    placeholders = {}  # node_name -> st.empty()
+    placeholders = {}  # node_name -> st.empty() az éppen futó turnhöz
+    buffers = {}  # node_name -> eddig streamelt szöveg
 
     initial = {
         "messages": [{"role": "user", "content": prompt}],
         "turn": 0,
+        "stop_reason": "",
+        "turns_saved": 0,
     }
-
-    for update in app.stream(
-        initial,
-        config={"configurable": {"thread_id": st.session_state.thread_id}},
-        stream_mode="updates",
-    ):
-        for node_name, partial_state in update.items():
-            msgs = partial_state.get("messages", [])
-            if not msgs:
-                continue
-
-            last = msgs[-1]
-            if not isinstance(last, AIMessage):
-                continue
-
-            speaker = NODE_TO_SPEAKER[node_name]
-            text = content_to_text(last.content)
-
-            # 2/a) live bubble frissítés node-onként
-            if node_name not in placeholders:
-                with st.chat_message("assistant"):
-                    placeholders[node_name] = st.empty()
-            meta = SPEAKERS.get(speaker, {"label": speaker, "emoji": "🤖"})
+    for event in stream_turns(app, initial, config):
+        node_name = event["node"]
+        speaker = NODE_TO_SPEAKER.get(node_name)
+        if speaker is None:
+            continue
+
+        # 2/a) live bubble: új turn -> új bubble, tokenenként frissítve
+        if node_name not in placeholders:
+            with st.chat_message("assistant"):
+                placeholders[node_name] = st.empty()
+                buffers[node_name] = ""
+
+        if event["type"] == "token":
+            buffers[node_name] += event["text"]
             placeholders[node_name].markdown(
-                f"{meta['emoji']} **{meta['label']}**\n\n{text}"
+                bubble_markdown(speaker, buffers[node_name] + "▌")
             )
-
-            # 2/b) ✅ transcript mentése dupe nélkül
-            mid = getattr(last, "id", None)
-            key = mid or f"{node_name}:{hash(text)}"  # fallback, ha nincs id
-
-            if key not in st.session_state.seen_ids:
-                st.session_state.seen_ids.add(key)
-                st.session_state.history.append({"speaker": speaker, "text": text})
-
-    st.rerun()
+            continue
+
+        last = event["message"]
+        text = message_text(last)
+        item = history_item(speaker, text, format_timing(event))
+        placeholders[node_name].markdown(item["markdown"])
+        # a node következő turnje már új bubble-be kerül
+        del placeholders[node_name]
+        del buffers[node_name]
+
+        # 2/b) ✅ transcript mentése dupe nélkül
+        mid = getattr(last, "id", None)
+        key = mid or f"{node_name}:{hash(text)}"  # fallback, ha nincs id
+
+        if st.session_state.seen_ids.get(key) is None:
+            st.session_state.seen_ids.put(key, True)
+            st.session_state.history.append(item)
+
+    final_state = app.get_state(config).values
+    st.session_state.last_stop = (
+        (final_state["stop_reason"], final_state.get("turns_saved", 0))
+        if final_state.get("stop_reason")
+        else None
+    )
+
+    # nincs st.rerun(): a bubble-ök már kint vannak, csak a sidebar és a
+    # leállási jelzés frissül helyben
+    render_metrics(metrics_box, final_state)
+    render_stop_notice(st.session_state.last_stop)
@@ -0,0 +1,70 @@
+import os
+import types
+
+import httpx
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+from src import conversationBuilder as cb  # noqa: E402
+from src.fakeLLM import FakeChatModel  # noqa: E402
+from src.llmClients import openai_chat_model, set_chat_model_factory  # noqa: E402
+from src.messages import message_text  # noqa: E402
+from src.schedules import get_routing  # noqa: E402
+
+
+@pytest.fixture
+def timing_out_primary(monkeypatch):
+    # the primary model is the real ChatOpenAI whose every request times
+    # out, each one moving the turn clock by its full timeout; the fallback
+    # (MODEL_SPECS "frontendDeveloperLocal") is a fake
+    monkeypatch.setattr(cb, "FALLBACK_MODEL", "frontendDeveloperLocal")
+    clock = [0.0]
+    monkeypatch.setattr(cb, "time", types.SimpleNamespace(perf_counter=lambda: clock[0]))
+    attempts = []
+
+    def time_out(request):
+        attempts.append(request)
+        clock[0] += request.extensions["timeout"]["read"]
+        raise httpx.ReadTimeout("timed out", request=request)
+
+    client = httpx.Client(transport=httpx.MockTransport(time_out))
+
+    def factory(model, **kwargs):
+        if model == "local-model":
+            return FakeChatModel(model_name=model, output_tokens=4)
+        return openai_chat_model(model, **{**kwargs, "http_client": client})
+
+    cb.shared_agent.cache_clear()
+    cb.fallback_agent.cache_clear()
+    set_chat_model_factory(factory)
+    yield attempts
+    set_chat_model_factory(None)
+    cb.shared_agent.cache_clear()
+    cb.fallback_agent.cache_clear()
+
+
+def test_primary_attempts_fit_the_turn_deadline_with_default_settings(monkeypatch):
+    monkeypatch.setattr(cb, "FALLBACK_MODEL", "frontendDeveloperLocal")
+    budget = cb.TURN_DEADLINE_SECONDS - cb.FALLBACK_RESERVE_SECONDS
+    routing = get_routing()
+    for node in routing.roles:
+        timeout, retries = cb.primary_call_limits(routing.timeouts.get(node))
+        assert (retries + 1) * timeout <= budget
+
+
+def test_fallback_answers_when_the_primary_times_out(timing_out_primary):
+    routing = get_routing()
+    agent = cb.shared_agent("fe", routing.models["fe"], routing.timeouts.get("fe"))
+    _, retries = cb.primary_call_limits(routing.timeouts.get("fe"))
+
+    result, fallback = cb.invoke_agent(
+        agent,
+        cb.SHARED_PROMPTS["fe"],
+        {"messages": [{"role": "user", "content": "Milyen mezők kellenek?"}]},
+        {},
+    )
+
+    assert fallback
+    assert message_text(result["messages"][-1])
+    assert len(timing_out_primary) == retries + 1
@@ -0,0 +1,149 @@
+import asyncio
+import threading
+import time
+import types
+
+import pytest
+
+from src import modelScheduler
+from src.modelScheduler import ModelScheduler
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # a scheduler időablaka kézzel léptetett órán fut
+    now = [1000.0]
+    monkeypatch.setattr(modelScheduler, "time", types.SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def _drained(scheduler):
+    stats = scheduler.stats()
+    return stats["running"] == 0 and not any(stats["queued"].values())
+
+
+def test_cancelled_aslot_leaves_no_ticket_behind():
+    scheduler = ModelScheduler(max_concurrent=1)
+
+    async def scenario():
+        async with scheduler.aslot("holder"):
+            waiter = asyncio.create_task(scheduler.aslot("waiter").__aenter__())
+            await asyncio.sleep(0.1)
+            assert scheduler.stats()["queued"]["interactive"] == 1
+            waiter.cancel()
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                pass
+        assert _drained(scheduler)
+        async with asyncio.timeout(1):
+            async with scheduler.aslot("next") as ticket:
+                assert ticket.admitted.is_set()
+
+    asyncio.run(scenario())
+    assert _drained(scheduler)
+
+
+def test_interrupted_slot_leaves_no_ticket_behind():
+    scheduler = ModelScheduler(max_concurrent=1)
+    original_poll = scheduler._poll
+
+    def interrupted_poll(ticket):
+        if ticket.meeting == "waiter":
+            raise KeyboardInterrupt
+        return original_poll(ticket)
+
+    scheduler._poll = interrupted_poll
+    errors = []
+
+    def wait_for_slot():
+        try:
+            with scheduler.slot("waiter"):
+                pass
+        except KeyboardInterrupt as err:
+            errors.append(err)
+
+    with scheduler.slot("holder"):
+        waiter = threading.Thread(target=wait_for_slot)
+        waiter.start()
+        waiter.join(timeout=2)
+        assert errors and not waiter.is_alive()
+        assert scheduler.stats()["queued"]["interactive"] == 0
+
+    assert _drained(scheduler)
+    with scheduler.slot("next") as ticket:
+        assert ticket.admitted.is_set()
+
+
+def test_ticket_admitted_while_abandoned_releases_its_slot():
+    scheduler = ModelScheduler(max_concurrent=1)
+    ticket = scheduler._enqueue("meeting", "interactive", 0)
+    assert ticket.admitted.is_set()
+    scheduler._abandon(ticket)
+    assert _drained(scheduler)
+    start = time.monotonic()
+    with scheduler.slot("next"):
+        assert time.monotonic() - start < 0.2
+
+
+def test_interactive_tickets_are_admitted_before_batch(clock):
+    scheduler = ModelScheduler(max_concurrent=1)
+    holder = scheduler._enqueue("holder", "interactive", 0)
+    batch = scheduler._enqueue("nightly", "batch", 0)
+    interactive = scheduler._enqueue("ui", "interactive", 0)
+    assert holder.admitted.is_set()
+    assert not batch.admitted.is_set() and not interactive.admitted.is_set()
+
+    scheduler._release(holder)
+    assert interactive.admitted.is_set() and not batch.admitted.is_set()
+    scheduler._release(interactive)
+    assert batch.admitted.is_set()
+
+
+def test_meetings_are_served_round_robin(clock):
+    scheduler = ModelScheduler(max_concurrent=1)
+    holder = scheduler._enqueue("holder", "interactive", 0)
+    busy = [scheduler._enqueue("busy", "interactive", 0) for _ in range(3)]
+    quiet = scheduler._enqueue("quiet", "interactive", 0)
+
+    order = []
+    running = holder
+    for _ in range(4):
+        scheduler._release(running)
+        running = next(t for t in [*busy, quiet] if t.admitted.is_set() and t not in order)
+        order.append(running)
+    assert order == [busy[0], quiet, busy[1], busy[2]]
+
+
+def test_tokens_per_minute_window_limits_admission(clock):
+    scheduler = ModelScheduler(max_concurrent=10, tokens_per_minute=100)
+    first = scheduler._enqueue("a", "interactive", 80)
+    second = scheduler._enqueue("b", "interactive", 50)
+    assert first.admitted.is_set() and not second.admitted.is_set()
+    assert scheduler.stats()["tokens_last_minute"] == 80
+
+    clock[0] += modelScheduler.WINDOW_SECONDS - 1
+    assert not scheduler._poll(second)
+    clock[0] += 2
+    assert scheduler._poll(second)
+    assert scheduler.stats()["tokens_last_minute"] == 50
+
+
+def test_oversized_call_passes_on_an_empty_window(clock):
+    scheduler = ModelScheduler(max_concurrent=10, tokens_per_minute=100)
+    assert scheduler._enqueue("a", "interactive", 500).admitted.is_set()
+    assert not scheduler._enqueue("b", "interactive", 1).admitted.is_set()
+
+
+def test_reported_usage_corrects_the_estimate(clock):
+    scheduler = ModelScheduler(max_concurrent=10, tokens_per_minute=100)
+    overestimated = scheduler._enqueue("a", "interactive", 80)
+    waiting = scheduler._enqueue("b", "interactive", 50)
+    assert not waiting.admitted.is_set()
+    overestimated.report(30)
+    assert scheduler._poll(waiting)
+
+    underestimated = scheduler._enqueue("c", "interactive", 5)
+    underestimated.report(60)
+    assert scheduler.stats()["tokens_last_minute"] == 140
+    assert not scheduler._enqueue("d", "interactive", 5).admitted.is_set()
@@ -0,0 +1,38 @@
+import pytest
+
+from src.roleRouter import classify_role, parse_role
+
+ROLES = ("frontenddeveloper", "businessanalyst")
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "Where is the uid stored?",
+        "Mi legyen a dátum formátuma?",
+        "The hookup is on Friday.",
+        "Is the new kpis folder ready?",
+        "That would be a roiling debate.",
+    ],
+)
+def test_short_stems_do_not_match_inside_other_words(text):
+    assert classify_role(text) is None
+
+
+@pytest.mark.parametrize(
+    "text, role",
+    [
+        ("Fix the UI.", "frontenddeveloper"),
+        ("Which form fields and CSS do we need?", "frontenddeveloper"),
+        ("Melyik React komponenseket írjuk meg?", "frontenddeveloper"),
+        ("What is the ROI of this?", "businessanalyst"),
+        ("Mik az MVP követelményei?", "businessanalyst"),
+    ],
+)
+def test_keywords_route_confidently(text, role):
+    assert classify_role(text)[0] == role
+
+
+def test_parse_role_accepts_exactly_one_mentioned_role():
+    assert parse_role("{frontenddeveloper}", ROLES) == "frontenddeveloper"
+    assert parse_role("frontenddeveloper or businessanalyst", ROLES) is None
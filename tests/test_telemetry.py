@@ -0,0 +1,12 @@
+import json
+
+from src.telemetry import LogSink, turn_record
+
+
+def test_log_sink_prints_records_without_logging_config(capsys):
+    sink = LogSink()
+    sink.emit(turn_record("fe", "gpt-4.1-nano", 1, 0.5, 0.1))
+
+    printed = json.loads(capsys.readouterr().err.strip().splitlines()[-1])
+    assert printed["node"] == "fe"
+    assert printed["wall_s"] == 0.5